@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lectura en caché del archivo de credenciales.
+El archivo se vuelve a leer solo si cambia su fecha de modificación.
+"""
+
+import os
+import functools
+from typing import Dict, Any
+
+import orjson
+
+@functools.lru_cache(maxsize=4)
+def _load_raw(path: str, mtime: float) -> Dict[str, Any]:
+    """
+    Lee y parsea el archivo JSON (cacheado por ruta y fecha de modificación).
+
+    Args:
+        path: Ruta absoluta al archivo
+        mtime: Fecha de modificación del archivo (parte de la clave de caché)
+
+    Returns:
+        dict: Contenido del archivo
+    """
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+def load_credentials(path: str) -> Dict[str, Any]:
+    """
+    Carga el archivo de credenciales, reutilizando la lectura anterior si no cambió.
+
+    El diccionario devuelto es compartido entre llamadas: no debe modificarse.
+
+    Args:
+        path: Ruta al archivo de credenciales
+
+    Returns:
+        dict: Contenido del archivo
+
+    Raises:
+        FileNotFoundError: Si no existe el archivo
+        json.JSONDecodeError: Si el archivo no es un JSON válido
+    """
+    path = os.path.abspath(path)
+    return _load_raw(path, os.path.getmtime(path))
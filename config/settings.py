@@ -8,17 +8,15 @@ y no requieren estar en credentials.json.
 """
 
 import os
-import json
 from pathlib import Path
 
+from config._loader import load_credentials
+
 # Rutas importantes
 ROOT_DIR = Path(__file__).parent.parent
 CONFIG_DIR = ROOT_DIR / "config"
 LOG_DIR = ROOT_DIR / "logs"
 
-# Asegurar que el directorio de logs existe
-os.makedirs(LOG_DIR, exist_ok=True)
-
 # Nombre del archivo de log actual
 LOG_FILENAME = "ml_tn_sync.log"
 
@@ -31,9 +29,21 @@ DEFAULT_CONFIG = {
         # Tiempo entre peticiones a la API de Mercado Libre (en segundos)
         "ml_api_rate_limit": 0.5,
         
+        # Peticiones simultáneas a la API de Mercado Libre
+        "ml_api_max_workers": 8,
+        
+        # Peticiones que pueden enviarse en ráfaga a la API de Mercado Libre antes de aplicar el límite
+        "ml_api_burst": 1,
+        
         # Tiempo entre peticiones a la API de Tienda Nube (en segundos)
         "tn_api_rate_limit": 0.5,
         
+        # Peticiones simultáneas a la API de Tienda Nube
+        "tn_api_max_workers": 6,
+        
+        # Peticiones que pueden enviarse en ráfaga a la API de Tienda Nube antes de aplicar el límite
+        "tn_api_burst": 10,
+        
         # Emparejar productos por SKU (si es False, intenta emparejar por nombre)
         "match_by_sku": True,
         
@@ -41,7 +51,14 @@ DEFAULT_CONFIG = {
         "price_round_digits": 2,
         
         # Diferencia mínima de precio para realizar actualización (para evitar cambios innecesarios)
-        "min_price_diff": 0.01
+        "min_price_diff": 0.01,
+        
+        # Vigencia de los catálogos guardados entre ejecuciones (en segundos, 0 para desactivar).
+        # Mientras esté vigente se usan los precios de Mercado Libre guardados, no los actuales
+        "catalog_cache_ttl": 0,
+        
+        # Tiempo mínimo entre sincronizaciones reales (en segundos, 0 para desactivar)
+        "min_sync_interval": 0
     }
 }
 
@@ -62,8 +79,7 @@ def load_settings(config_path=None):
     
     try:
         if os.path.exists(config_path):
-            with open(config_path, 'r', encoding='utf-8') as f:
-                user_config = json.load(f)
+            user_config = load_credentials(config_path)
                 
             # Actualizar configuración con valores del usuario
             if 'settings' in user_config:
@@ -73,5 +89,16 @@ def load_settings(config_path=None):
     
     return config
 
-# Cargar configuración al importar el módulo
-SETTINGS = load_settings().get('settings', {})
+def __getattr__(name):
+    """
+    Carga SETTINGS recién cuando se accede por primera vez (PEP 562).
+    
+    Así, importar el módulo no lee credentials.json del disco.
+    """
+    if name == 'SETTINGS':
+        settings = load_settings().get('settings', {})
+        # Guardar como global para que los accesos siguientes no pasen por aquí
+        globals()['SETTINGS'] = settings
+        return settings
+    
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
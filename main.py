@@ -12,18 +12,11 @@ Fecha: Mayo 2025
 
 import os
 import sys
-import logging
 import argparse
-from datetime import datetime
 
 # Asegurar que podemos importar módulos desde src/
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
 
-from src.api.mercadolibre import MercadoLibreAPI
-from src.api.tiendanube import TiendaNubeAPI
-from src.core.synchronizer import PriceSynchronizer
-from src.utils.logger import setup_logger
-
 def parse_arguments():
     """Analiza los argumentos de la línea de comandos"""
     parser = argparse.ArgumentParser(
@@ -35,6 +28,10 @@ def parse_arguments():
     parser.add_argument('--dry-run', action='store_true',
                         help='Ejecuta en modo simulación (no realiza cambios reales)')
     
+    parser.add_argument('--force-refresh', action='store_true',
+                        help='Descarga los catálogos y sincroniza aunque haya una copia guardada ' +
+                             'vigente o no haya pasado el intervalo mínimo entre sincronizaciones')
+    
     parser.add_argument('--config', type=str, default='config/credentials.json',
                         help='Ruta al archivo de configuración (por defecto: config/credentials.json)')
     
@@ -45,6 +42,15 @@ def main():
     # Parsear argumentos
     args = parse_arguments()
     
+    # Importaciones diferidas: --help termina antes de cargar requests y las APIs
+    import logging
+    from datetime import datetime
+    
+    from src.api.mercadolibre_api import MercadoLibreAPI
+    from src.api.tiendanube_api import TiendaNubeAPI
+    from src.core.synchronizer import PriceSynchronizer
+    from src.utils.logger import setup_logger
+    
     # Configurar logger
     log_level = logging.DEBUG if args.debug else logging.INFO
     logger = setup_logger(log_level)
@@ -59,10 +65,11 @@ def main():
         tn_api = TiendaNubeAPI(config_path=args.config)
         
         # Crear sincronizador
-        synchronizer = PriceSynchronizer(ml_api, tn_api, dry_run=args.dry_run)
+        synchronizer = PriceSynchronizer(ml_api, tn_api, config_path=args.config,
+                                         dry_run=args.dry_run)
         
         # Ejecutar sincronización
-        synchronizer.sync_prices()
+        synchronizer.sync_prices(force_refresh=args.force_refresh)
         
         # Mostrar información de finalización
         logger.info("Sincronización completada correctamente")
@@ -1,5 +1,6 @@
 # Dependencias para ML-TN-Sync
 requests>=2.28.0
+orjson>=3.8.0
 python-dotenv>=1.0.0
 pytz>=2023.3
 tqdm>=4.65.0
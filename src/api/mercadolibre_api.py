@@ -6,17 +6,56 @@ Módulo para interactuar con la API de Mercado Libre.
 Provee funcionalidades para autenticación y obtención de productos.
 """
 
+import os
 import time
 import json
 import logging
+import shutil
+import operator
+import threading
+import orjson
 import requests
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, NamedTuple, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: se escribe el archivo sin bloqueo
+    fcntl = None
+
+from config._loader import load_credentials
+from src.utils.http import create_session
+from src.utils.concurrency import iter_bounded
+from src.utils.rate_limiter import TokenBucket
 
 logger = logging.getLogger(__name__)
 
+class MLProduct(NamedTuple):
+    """Producto de Mercado Libre con los datos usados en la sincronización"""
+    id: str
+    title: str
+    price: float
+    currency_id: str
+    sku: Optional[str]
+    permalink: str
+    category_id: Optional[str] = None
+    listing_type_id: Optional[str] = None
+    available_quantity: int = 0
+    status: Optional[str] = None
+
+# Campos obligatorios de un item, extraídos con una sola llamada en C
+_ITEM_CORE_FIELDS = operator.itemgetter("id", "title", "price", "currency_id", "permalink")
+
 class MercadoLibreAPI:
     """Cliente para la API de Mercado Libre"""
     
+    # Máximo de items por petición al endpoint multiget /items?ids=
+    ITEMS_BATCH_SIZE = 20
+    
+    # Campos que se piden a la API (reduce el tamaño de las respuestas)
+    ITEM_ATTRIBUTES = ("id,title,price,currency_id,attributes,permalink,"
+                       "category_id,listing_type_id,available_quantity,status")
+    
     def __init__(self, config_path: str = 'config/credentials.json'):
         """
         Inicializa el cliente de la API de Mercado Libre.
@@ -31,12 +70,27 @@ class MercadoLibreAPI:
         self.client_secret = None
         self.user_id = None
         self.rate_limit = 0.5  # Tiempo entre peticiones (segundos)
+        self.rate_burst = 1    # Peticiones que pueden enviarse en ráfaga
+        self.max_workers = 8   # Peticiones de detalle concurrentes
+        
+        # El token vigente se guarda junto al archivo de configuración
+        self.config_path = config_path
+        self.token_cache_path = os.path.join(
+            os.path.dirname(os.path.abspath(config_path)), ".ml_token_cache.json")
+        self._token_lock = threading.Lock()
         
         # Cargar configuración
         self._load_config(config_path)
         
-        # Actualizar token
-        self.refresh_access_token()
+        # Sesión HTTP compartida (keep-alive, pool de conexiones y reintentos)
+        self.session = create_session(self.max_workers)
+        
+        # Limitador compartido por todos los hilos
+        self.rate_limiter = TokenBucket.from_interval(self.rate_limit, self.rate_burst)
+        
+        # Reutilizar el token guardado si sigue vigente; si no, actualizarlo
+        if not self._load_token_cache():
+            self.refresh_access_token()
     
     def _load_config(self, config_path: str) -> None:
         """
@@ -50,8 +104,7 @@ class MercadoLibreAPI:
             KeyError: Si falta alguna credencial necesaria
         """
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            config = load_credentials(config_path)
             
             # Extraer credenciales de Mercado Libre
             ml_config = config.get('mercadolibre', {})
@@ -78,6 +131,12 @@ class MercadoLibreAPI:
             if 'settings' in config and 'ml_api_rate_limit' in config['settings']:
                 self.rate_limit = config['settings']['ml_api_rate_limit']
             
+            if 'settings' in config and 'ml_api_max_workers' in config['settings']:
+                self.max_workers = max(1, int(config['settings']['ml_api_max_workers']))
+            
+            if 'settings' in config and 'ml_api_burst' in config['settings']:
+                self.rate_burst = max(1, int(config['settings']['ml_api_burst']))
+            
             logger.info("Configuración de Mercado Libre cargada correctamente")
         
         except FileNotFoundError:
@@ -110,95 +169,264 @@ class MercadoLibreAPI:
         }
         
         try:
-            response = requests.post(url, headers=headers, data=payload)
+            response = self.session.post(url, headers=headers, data=payload)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             self.access_token = data["access_token"]
             # Guardar el nuevo refresh token
             self.refresh_token = data["refresh_token"]
             
-            # Se podría implementar guardar el nuevo refresh token en el archivo de configuración
-            
             logger.info("Token de Mercado Libre actualizado correctamente")
         except Exception as e:
             logger.error(f"Error al refrescar token de Mercado Libre: {e}")
             raise
+        
+        # Mercado Libre invalida el refresh token anterior: hay que persistir el nuevo
+        self._save_refresh_token()
+        
+        # Un margen de 60 segundos evita usar un token a punto de vencer
+        self._save_token_cache(time.time() + data.get("expires_in", 21600) - 60)
+    
+    def _save_refresh_token(self) -> None:
+        """
+        Guarda el refresh token actual en el archivo de configuración.
+        
+        El archivo se relee bajo un bloqueo y se reemplaza de forma atómica,
+        para no pisar cambios de otro proceso ni dejarlo a medio escribir.
+        """
+        lock_path = f"{self.config_path}.lock"
+        tmp_path = f"{self.config_path}.tmp"
+        
+        try:
+            with open(lock_path, 'a') as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                
+                with open(self.config_path, 'rb') as f:
+                    config = orjson.loads(f.read())
+                
+                ml_config = config.setdefault('mercadolibre', {})
+                if ml_config.get('refresh_token') == self.refresh_token:
+                    return
+                
+                ml_config['refresh_token'] = self.refresh_token
+                
+                # json conserva la sangría de 4 espacios del archivo editado a mano
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(config, f, indent=4, ensure_ascii=False)
+                shutil.copymode(self.config_path, tmp_path)
+                os.replace(tmp_path, self.config_path)
+            
+            logger.info("Refresh token de Mercado Libre guardado en la configuración")
+        
+        except (OSError, ValueError) as e:
+            logger.warning(f"No se pudo guardar el refresh token en {self.config_path}: {e}")
+    
+    def _load_token_cache(self) -> bool:
+        """
+        Carga el token de acceso guardado por una ejecución anterior.
+        
+        Returns:
+            True si se cargó un token vigente, False en caso contrario
+        """
+        try:
+            with open(self.token_cache_path, 'rb') as f:
+                cache = orjson.loads(f.read())
+            
+            # Ignorar tokens vencidos o de otra aplicación
+            if cache.get("client_id") != self.client_id or cache.get("expires_at", 0) <= time.time():
+                return False
+            
+            # El refresh token se toma siempre de la configuración, que tiene el más reciente
+            self.access_token = cache["access_token"]
+        
+        except FileNotFoundError:
+            return False
+        except (ValueError, KeyError, OSError) as e:
+            logger.warning(f"No se pudo leer el token guardado de Mercado Libre: {e}")
+            return False
+        
+        logger.info("Usando token de Mercado Libre guardado")
+        return True
+    
+    def _save_token_cache(self, expires_at: float) -> None:
+        """
+        Guarda el token de acceso actual para reutilizarlo en otras ejecuciones.
+        
+        Args:
+            expires_at: Momento de vencimiento del token (timestamp)
+        """
+        cache = {
+            "client_id": self.client_id,
+            "access_token": self.access_token,
+            "expires_at": expires_at
+        }
+        
+        tmp_path = f"{self.token_cache_path}.tmp"
+        
+        try:
+            # Solo el usuario actual puede leer el archivo (contiene credenciales)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(orjson.dumps(cache))
+            os.replace(tmp_path, self.token_cache_path)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el token de Mercado Libre: {e}")
+    
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Realiza una petición autenticada respetando el límite de la API.
+        
+        Los errores 429/5xx se reintentan en la sesión (respetando Retry-After).
+        Si el token fue revocado o venció (HTTP 401), se actualiza una vez y
+        se reintenta la petición.
+        
+        Args:
+            method: Método HTTP
+            url: URL de la petición
+            **kwargs: Argumentos adicionales para requests
+            
+        Returns:
+            Respuesta de la API
+        """
+        for attempt in range(2):
+            token = self.access_token
+            
+            # Esperar para no exceder el límite de la API
+            self.rate_limiter.acquire()
+            response = self.session.request(
+                method, url, headers={"Authorization": f"Bearer {token}"}, **kwargs)
+            
+            if response.status_code != 401 or attempt:
+                return response
+            
+            # Evitar que varios hilos refresquen el mismo token a la vez
+            with self._token_lock:
+                if self.access_token == token:
+                    logger.info("Token de Mercado Libre rechazado, actualizando...")
+                    self.refresh_access_token()
+        
+        return response
     
-    def get_products(self) -> List[Dict[str, Any]]:
+    def get_products(self) -> List[MLProduct]:
         """
         Obtiene todos los productos del vendedor en Mercado Libre.
         
         Returns:
             Lista de productos con sus detalles
         """
+        try:
+            product_details = list(self.iter_products())
+            logger.info(f"Se obtuvieron detalles de {len(product_details)} productos")
+            return product_details
+        
+        except Exception as e:
+            logger.error(f"Error al obtener productos de Mercado Libre: {e}")
+            return []
+    
+    def iter_products(self) -> Iterator[MLProduct]:
+        """
+        Recorre los productos del vendedor a medida que se descargan sus detalles.
+        
+        Se mantienen en memoria todos los IDs, pero como máximo max_workers
+        lotes de detalles pendientes de consumir. Si se deja de iterar, los
+        lotes que aún no se pidieron se cancelan. Los errores de la API se
+        propagan al consumidor.
+        
+        Yields:
+            Productos con sus detalles, en el orden de la búsqueda
+        """
         url = f"{self.base_url}/users/{self.user_id}/items/search"
-        headers = {"Authorization": f"Bearer {self.access_token}"}
         
-        try:
-            all_products = []
-            offset = 0
-            limit = 50
-            
-            # Primera petición para obtener el total
-            response = requests.get(
-                url, 
-                headers=headers, 
-                params={"offset": offset, "limit": limit}
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            total_items = len(data["results"])
-            paging_total = data.get("paging", {}).get("total", 0)
+        all_products = []
+        # search_type=scan no tiene el tope de 1000 items de la paginación por offset
+        params = {"search_type": "scan", "limit": 100}
+        
+        # Primera petición para obtener el total y el cursor
+        response = self._request("GET", url, params=params)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        
+        paging_total = data.get("paging", {}).get("total", 0)
+        
+        logger.info(f"Se encontraron {paging_total} productos en Mercado Libre")
+        
+        # Añadir resultados de la primera petición
+        all_products.extend(data["results"])
+        
+        # Obtener el resto de páginas con el cursor hasta agotar los resultados
+        while data["results"] and data.get("scroll_id") and len(all_products) < paging_total:
+            params["scroll_id"] = data["scroll_id"]
             
-            logger.info(f"Se encontraron {paging_total} productos en Mercado Libre")
+            logger.debug(f"Obteniendo productos: {len(all_products)} de {paging_total}")
             
-            # Añadir resultados de la primera petición
+            response = self._request("GET", url, params=params)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
             all_products.extend(data["results"])
-            
-            # Obtener el resto de páginas
-            while offset + limit < paging_total:
-                offset += limit
-                # Esperar para no exceder el límite de la API
-                time.sleep(self.rate_limit)
-                
-                logger.debug(f"Obteniendo productos: {offset}-{offset+limit} de {paging_total}")
+        
+        # Obtener detalles en lotes usando el endpoint multiget
+        total_products = len(all_products)
+        batch_size = self.ITEMS_BATCH_SIZE
+        batches = [all_products[i:i + batch_size] for i in range(0, total_products, batch_size)]
+        
+        logger.info(f"Obteniendo detalles de {total_products} productos en {len(batches)} lotes...")
+        
+        # Informar progreso cada 10 lotes o en múltiplos del 10% (solo en modo depuración)
+        total_batches = len(batches)
+        step = max(1, total_batches // 10)
+        milestones = set(range(step, total_batches + 1, step))
+        log_progress = logger.isEnabledFor(logging.DEBUG)
+        
+        # Los lotes se piden en paralelo; el limitador regula el ritmo global
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = iter_bounded(executor, self.get_products_details, batches, self.max_workers)
+            for i, products in enumerate(results, 1):
+                if log_progress and (i % 10 == 0 or i in milestones):
+                    logger.debug(f"Progreso: {i}/{total_batches} lotes procesados ({i/total_batches*100:.1f}%)")
                 
-                response = requests.get(
-                    url, 
-                    headers=headers, 
-                    params={"offset": offset, "limit": limit}
-                )
-                response.raise_for_status()
-                data = response.json()
-                all_products.extend(data["results"])
-            
-            # Obtener detalles de cada producto
-            product_details = []
-            total_products = len(all_products)
-            
-            logger.info(f"Obteniendo detalles de {total_products} productos...")
-            
-            for i, item_id in enumerate(all_products, 1):
-                # Informar progreso cada 10 productos o en múltiplos del 10%
-                if i % 10 == 0 or i % max(1, int(total_products * 0.1)) == 0:
-                    logger.debug(f"Progreso: {i}/{total_products} productos procesados ({i/total_products*100:.1f}%)")
+                yield from products
+    
+    def get_products_details(self, item_ids: List[str]) -> List[MLProduct]:
+        """
+        Obtiene los detalles de varios productos en una sola petición.
+        
+        Args:
+            item_ids: IDs de los productos en Mercado Libre (máximo ITEMS_BATCH_SIZE)
+            
+        Returns:
+            Lista con los detalles de los productos obtenidos correctamente
+        """
+        url = f"{self.base_url}/items"
+        params = {"ids": ",".join(item_ids), "attributes": self.ITEM_ATTRIBUTES}
+        
+        try:
+            response = self._request("GET", url, params=params)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            
+            # Cada elemento viene envuelto en {"code": ..., "body": {...}}
+            products = []
+            for entry in data:
+                if entry.get("code") != 200:
+                    logger.error(f"Error al obtener detalles del producto: {entry.get('body')}")
+                    continue
                 
-                # Esperar para no exceder el límite de la API
-                time.sleep(self.rate_limit)
-                product = self.get_product_details(item_id)
-                if product:
-                    product_details.append(product)
+                # Un item con datos incompletos no descarta el resto del lote
+                try:
+                    products.append(self._parse_item(entry["body"]))
+                except (KeyError, TypeError) as e:
+                    item_id = entry["body"].get("id") if isinstance(entry.get("body"), dict) else None
+                    logger.error(f"Error al procesar el producto {item_id}: {e!r}")
             
-            logger.info(f"Se obtuvieron detalles de {len(product_details)} productos")
-            return product_details
+            return products
         
         except Exception as e:
-            logger.error(f"Error al obtener productos de Mercado Libre: {e}")
+            logger.error(f"Error al obtener detalles de los productos {', '.join(item_ids)}: {e}")
             return []
     
-    def get_product_details(self, item_id: str) -> Optional[Dict[str, Any]]:
+    def get_product_details(self, item_id: str) -> Optional[MLProduct]:
         """
         Obtiene los detalles de un producto específico.
         
@@ -206,39 +434,43 @@ class MercadoLibreAPI:
             item_id: ID del producto en Mercado Libre
             
         Returns:
-            Diccionario con los detalles del producto o None si hay error
+            Producto con sus detalles o None si hay error
         """
         url = f"{self.base_url}/items/{item_id}"
-        headers = {"Authorization": f"Bearer {self.access_token}"}
         
         try:
-            response = requests.get(url, headers=headers)
+            response = self._request("GET", url, params={"attributes": self.ITEM_ATTRIBUTES})
             response.raise_for_status()
-            data = response.json()
-            
-            # Extraer SKU de los atributos si existe
-            sku = None
-            for attr in data.get("attributes", []):
-                if attr.get("id") == "SELLER_SKU":
-                    sku = attr.get("value_name")
-                    break
-            
-            # Crear objeto de producto con los datos necesarios
-            product = {
-                "id": data["id"],
-                "title": data["title"],
-                "price": data["price"],
-                "currency_id": data["currency_id"],
-                "sku": sku,
-                "permalink": data["permalink"],
-                "category_id": data.get("category_id"),
-                "listing_type_id": data.get("listing_type_id"),
-                "available_quantity": data.get("available_quantity", 0),
-                "status": data.get("status")
-            }
-            
-            return product
+            
+            return self._parse_item(orjson.loads(response.content))
         
         except Exception as e:
             logger.error(f"Error al obtener detalles del producto {item_id}: {e}")
-            return None
\ No newline at end of file
+            return None
+    
+    @staticmethod
+    def _parse_item(data: Dict[str, Any]) -> MLProduct:
+        """
+        Extrae los datos necesarios de un item de la API de Mercado Libre.
+        
+        Args:
+            data: Item tal como lo devuelve la API
+            
+        Returns:
+            Producto con sus detalles
+        """
+        # Extraer SKU de los atributos si existe (se corta en la primera coincidencia)
+        sku = next((attr.get("value_name") for attr in data.get("attributes", ())
+                    if attr.get("id") == "SELLER_SKU"), None)
+        
+        item_id, title, price, currency_id, permalink = _ITEM_CORE_FIELDS(data)
+        get = data.get
+        
+        # Crear objeto de producto con los datos necesarios
+        return MLProduct(
+            item_id, title, price, currency_id, sku, permalink,
+            get("category_id"),
+            get("listing_type_id"),
+            get("available_quantity", 0),
+            get("status")
+        )
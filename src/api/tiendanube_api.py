@@ -6,17 +6,57 @@ Módulo para interactuar con la API de Tienda Nube.
 Provee funcionalidades para la obtención y actualización de productos.
 """
 
-import time
 import json
 import logging
+import orjson
 import requests
-from typing import Dict, List, Optional, Any, Union
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs
+from typing import Dict, List, Optional, Any, Union, Tuple, Iterator
+
+from config._loader import load_credentials
+from src.utils.http import create_session
+from src.utils.concurrency import iter_bounded
+from src.utils.rate_limiter import TokenBucket
 
 logger = logging.getLogger(__name__)
 
+# Errores 4xx temporales: no indican que la API rechace la actualización en bloque
+TRANSIENT_CLIENT_ERRORS = (408, 429)
+
+def build_sku_index(products: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Construye un índice SKU -> producto con los SKU de productos y variantes.
+    
+    Si un SKU aparece en varios productos se conserva el primero, igual que
+    al recorrer la lista en orden.
+    
+    Args:
+        products: Lista de productos de Tienda Nube
+        
+    Returns:
+        Diccionario que asocia cada SKU con su producto
+    """
+    sku_index = {}
+    
+    for product in products:
+        # SKU del producto principal
+        if product.get("sku"):
+            sku_index.setdefault(product["sku"], product)
+        
+        # SKU de las variantes
+        for variant in product.get("variants", ()):
+            if variant.get("sku"):
+                sku_index.setdefault(variant["sku"], product)
+    
+    return sku_index
+
 class TiendaNubeAPI:
     """Cliente para la API de Tienda Nube"""
     
+    # Productos por página (máximo permitido por la API)
+    PER_PAGE = 200
+    
     def __init__(self, config_path: str = 'config/credentials.json'):
         """
         Inicializa el cliente de la API de Tienda Nube.
@@ -28,7 +68,15 @@ class TiendaNubeAPI:
         self.user_id = None
         self.base_url = None
         self.headers = None
+        self.session = None
+        self.rate_limiter = None
         self.rate_limit = 0.5  # Tiempo entre peticiones (segundos)
+        self.rate_burst = 10   # Peticiones que pueden enviarse en ráfaga
+        self.max_workers = 6   # Páginas descargadas en paralelo
+        
+        # Catálogo descargado en esta ejecución e índice por SKU
+        self._products_cache = None
+        self._sku_index = None
         
         # Cargar configuración
         self._load_config(config_path)
@@ -48,8 +96,7 @@ class TiendaNubeAPI:
             KeyError: Si falta alguna credencial necesaria
         """
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            config = load_credentials(config_path)
             
             # Extraer credenciales de Tienda Nube
             tn_config = config.get('tiendanube', {})
@@ -70,6 +117,12 @@ class TiendaNubeAPI:
             if 'settings' in config and 'tn_api_rate_limit' in config['settings']:
                 self.rate_limit = config['settings']['tn_api_rate_limit']
             
+            if 'settings' in config and 'tn_api_max_workers' in config['settings']:
+                self.max_workers = max(1, int(config['settings']['tn_api_max_workers']))
+            
+            if 'settings' in config and 'tn_api_burst' in config['settings']:
+                self.rate_burst = max(1, int(config['settings']['tn_api_burst']))
+            
             logger.info("Configuración de Tienda Nube cargada correctamente")
         
         except FileNotFoundError:
@@ -90,52 +143,144 @@ class TiendaNubeAPI:
             "Content-Type": "application/json",
             "User-Agent": "ML-TN-Sync/1.0"
         }
+        
+        # Sesión HTTP compartida (keep-alive, pool de conexiones y reintentos)
+        self.session = create_session(self.max_workers)
+        self.session.headers.update(self.headers)
+        
+        # Limitador compartido por todos los hilos
+        self.rate_limiter = TokenBucket.from_interval(self.rate_limit, self.rate_burst)
     
-    def get_products(self) -> List[Dict[str, Any]]:
+    def get_products(self, use_cache: bool = True) -> List[Dict[str, Any]]:
         """
         Obtiene todos los productos de Tienda Nube.
         
+        El catálogo se descarga una sola vez por instancia; las llamadas
+        siguientes devuelven la copia en memoria hasta que se actualice
+        algún precio.
+        
+        Args:
+            use_cache: Si es False, vuelve a descargar el catálogo completo
+        
         Returns:
             Lista de productos con sus detalles
         """
-        url = f"{self.base_url}/products"
+        if use_cache and self._products_cache is not None:
+            return self._products_cache
         
         try:
-            all_products = []
-            page = 1
-            per_page = 50
-            
             logger.info("Obteniendo productos de Tienda Nube...")
-            
-            while True:
-                # Esperar para no exceder el límite de la API
-                time.sleep(self.rate_limit)
-                
-                logger.debug(f"Obteniendo página {page} de productos...")
-                
-                response = requests.get(
-                    url, 
-                    headers=self.headers, 
-                    params={"page": page, "per_page": per_page}
-                )
-                response.raise_for_status()
-                products = response.json()
-                
-                if not products:
-                    break
-                    
-                all_products.extend(products)
-                page += 1
-            
+            all_products = list(self.iter_products())
             logger.info(f"Se encontraron {len(all_products)} productos en Tienda Nube")
+            
+            self._products_cache = all_products
+            self._sku_index = build_sku_index(all_products)
             return all_products
         
         except Exception as e:
             logger.error(f"Error al obtener productos de Tienda Nube: {e}")
             return []
     
+    def _invalidate_products_cache(self) -> None:
+        """Descarta el catálogo en memoria después de modificar precios en la API."""
+        self._products_cache = None
+        self._sku_index = None
+    
+    def iter_products(self) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre los productos de Tienda Nube página por página, sin usar la caché.
+        
+        Se mantienen en memoria como máximo max_workers páginas pendientes de
+        consumir. Si se deja de iterar, las páginas que aún no se pidieron se
+        cancelan. Los errores de la API se propagan al consumidor.
+        
+        Yields:
+            Productos con sus detalles, en el orden de las páginas
+        """
+        # La primera página indica en el encabezado Link cuántas páginas hay
+        response = self._get_products_page(1)
+        products = orjson.loads(response.content)
+        last_page = self._get_last_page(response)
+        yield from products
+        
+        if last_page is not None:
+            # Con el total conocido, el resto de páginas se piden en paralelo
+            if last_page > 1:
+                logger.debug(f"Obteniendo páginas 2-{last_page} de productos...")
+                
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    pages = range(2, last_page + 1)
+                    for response in iter_bounded(executor, self._get_products_page,
+                                                 pages, self.max_workers):
+                        yield from orjson.loads(response.content)
+        else:
+            # Sin encabezado Link, se pagina hasta recibir una página vacía
+            page = 2
+            while products:
+                response = self._get_products_page(page)
+                products = orjson.loads(response.content)
+                yield from products
+                page += 1
+    
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Realiza una petición respetando el límite de la API.
+        
+        Los errores 429/5xx se reintentan en la sesión (respetando Retry-After).
+        
+        Args:
+            method: Método HTTP
+            url: URL de la petición
+            **kwargs: Argumentos adicionales para requests
+            
+        Returns:
+            Respuesta de la API
+        """
+        # Esperar para no exceder el límite de la API
+        self.rate_limiter.acquire()
+        return self.session.request(method, url, **kwargs)
+    
+    def _get_products_page(self, page: int) -> requests.Response:
+        """
+        Obtiene una página del listado de productos.
+        
+        Args:
+            page: Número de página (comenzando en 1)
+            
+        Returns:
+            Respuesta de la API
+        """
+        logger.debug(f"Obteniendo página {page} de productos...")
+        
+        response = self._request(
+            "GET",
+            f"{self.base_url}/products", 
+            params={"page": page, "per_page": self.PER_PAGE}
+        )
+        response.raise_for_status()
+        return response
+    
+    @staticmethod
+    def _get_last_page(response: requests.Response) -> Optional[int]:
+        """
+        Extrae el número de la última página del encabezado Link.
+        
+        Args:
+            response: Respuesta de una página del listado
+            
+        Returns:
+            Número de la última página o None si la API no lo informa
+        """
+        last_url = response.links.get("last", {}).get("url")
+        if not last_url:
+            return None
+        
+        page = parse_qs(urlparse(last_url).query).get("page")
+        return int(page[0]) if page else None
+    
     def update_product_price(self, product_id: Union[str, int], price: float, 
-                            dry_run: bool = False) -> bool:
+                            dry_run: bool = False, current_price: Optional[float] = None,
+                            min_diff: float = 0.01) -> bool:
         """
         Actualiza el precio de un producto en Tienda Nube.
         
@@ -143,10 +288,17 @@ class TiendaNubeAPI:
             product_id: ID del producto en Tienda Nube
             price: Nuevo precio del producto
             dry_run: Si es True, simula la actualización sin realizarla
+            current_price: Precio actual del producto, si se conoce
+            min_diff: Diferencia mínima con current_price para realizar la actualización
             
         Returns:
-            True si la actualización fue exitosa, False en caso contrario
+            True si la actualización fue exitosa (o no era necesaria), False en caso contrario
         """
+        # Evitar peticiones cuyo resultado sería el mismo precio
+        if current_price is not None and abs(price - current_price) < min_diff:
+            logger.debug(f"Precio sin cambios para el producto {product_id}: {current_price}")
+            return True
+        
         url = f"{self.base_url}/products/{product_id}"
         payload = {
             "price": price
@@ -157,19 +309,106 @@ class TiendaNubeAPI:
                 logger.info(f"[SIMULACIÓN] Actualizando precio del producto {product_id} a {price}")
                 return True
             
-            # Esperar para no exceder el límite de la API
-            time.sleep(self.rate_limit)
-            
-            response = requests.put(url, headers=self.headers, json=payload)
+            response = self._request("PUT", url, data=orjson.dumps(payload))
             response.raise_for_status()
             
             logger.info(f"Precio actualizado para el producto {product_id} a {price}")
+            self._invalidate_products_cache()
             return True
         
         except Exception as e:
             logger.error(f"Error al actualizar precio del producto {product_id}: {e}")
             return False
     
+    def update_variant_price(self, product_id: Union[str, int], variant_id: Union[str, int],
+                            price: float, dry_run: bool = False) -> bool:
+        """
+        Actualiza el precio de una variante de un producto en Tienda Nube.
+        
+        Args:
+            product_id: ID del producto en Tienda Nube
+            variant_id: ID de la variante
+            price: Nuevo precio de la variante
+            dry_run: Si es True, simula la actualización sin realizarla
+            
+        Returns:
+            True si la actualización fue exitosa, False en caso contrario
+        """
+        url = f"{self.base_url}/products/{product_id}/variants/{variant_id}"
+        payload = {
+            "price": price
+        }
+        
+        try:
+            if dry_run:
+                logger.info(f"[SIMULACIÓN] Actualizando precio de variante {variant_id} a {price}")
+                return True
+            
+            response = self._request("PUT", url, data=orjson.dumps(payload))
+            response.raise_for_status()
+            
+            logger.info(f"Precio actualizado para la variante {variant_id} a {price}")
+            self._invalidate_products_cache()
+            return True
+        
+        except Exception as e:
+            logger.error(f"Error al actualizar precio de la variante {variant_id}: {e}")
+            return False
+    
+    def update_variant_prices(self, product_id: Union[str, int],
+                             prices: List[Tuple[Union[str, int], float]],
+                             dry_run: bool = False) -> bool:
+        """
+        Actualiza los precios de varias variantes de un producto en una sola petición.
+        
+        Si la API rechaza la actualización en bloque (error 4xx), se actualiza
+        cada variante por separado. Los errores temporales (408 y 429) no
+        activan esa alternativa: se informan como fallo.
+        
+        Args:
+            product_id: ID del producto en Tienda Nube
+            prices: Lista de (ID de variante, nuevo precio)
+            dry_run: Si es True, simula la actualización sin realizarla
+            
+        Returns:
+            True si al menos una variante fue actualizada, False en caso contrario
+        """
+        if len(prices) == 1 or dry_run:
+            return any([self.update_variant_price(product_id, variant_id, price, dry_run)
+                        for variant_id, price in prices])
+        
+        url = f"{self.base_url}/products/{product_id}/variants"
+        payload = [{"id": variant_id, "price": price} for variant_id, price in prices]
+        
+        try:
+            response = self._request("PATCH", url, data=orjson.dumps(payload))
+            response.raise_for_status()
+            
+            logger.info(f"Precios actualizados para {len(prices)} variantes del producto {product_id}")
+            self._invalidate_products_cache()
+            return True
+        
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status is None or not 400 <= status < 500 or status in TRANSIENT_CLIENT_ERRORS:
+                logger.error(f"Error al actualizar precios de variantes del producto {product_id}: {e}")
+                return False
+            
+            logger.warning(f"Actualización en bloque rechazada para el producto {product_id} ({status}), " +
+                           "se actualizará cada variante por separado")
+        
+        except Exception as e:
+            logger.error(f"Error al actualizar precios de variantes del producto {product_id}: {e}")
+            return False
+        
+        # Alternativa: una petición por variante, en paralelo
+        def update(item: Tuple[Union[str, int], float]) -> bool:
+            variant_id, price = item
+            return self.update_variant_price(product_id, variant_id, price)
+        
+        with ThreadPoolExecutor(max_workers=min(len(prices), self.max_workers)) as executor:
+            return any(list(executor.map(update, prices)))
+    
     def get_product_by_sku(self, sku: str) -> Optional[Dict[str, Any]]:
         """
         Busca un producto por SKU en Tienda Nube.
@@ -180,18 +419,15 @@ class TiendaNubeAPI:
         Returns:
             Diccionario con los detalles del producto o None si no se encuentra
         """
-        # Primero obtenemos todos los productos
-        products = self.get_products()
+        # El índice se arma junto con el catálogo; si la descarga falló no se guarda
+        sku_index = self._sku_index
+        if sku_index is None:
+            sku_index = build_sku_index(self.get_products())
+            if self._products_cache is not None:
+                self._sku_index = sku_index
         
-        for product in products:
-            # Verificar SKU en el producto principal
-            if product.get("sku") == sku:
-                return product
-            
-            # Verificar SKU en las variantes
-            for variant in product.get("variants", []):
-                if variant.get("sku") == sku:
-                    return product
+        product = sku_index.get(sku)
+        if product is None:
+            logger.debug(f"No se encontró producto con SKU: {sku}")
         
-        logger.debug(f"No se encontró producto con SKU: {sku}")
-        return None
\ No newline at end of file
+        return product
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Búsqueda de coincidencias parciales de nombres entre catálogos.
+Usa un autómata de Aho-Corasick para encontrar en una sola pasada qué nombres
+aparecen dentro de un título, en lugar de comparar el título con cada nombre.
+"""
+
+from bisect import bisect_right
+from collections import deque
+from typing import Dict, List, Optional
+
+# Separador entre nombres; no aparece en títulos de productos
+_SEPARATOR = "\x00"
+
+class NameMatcher:
+    """Encuentra el primer nombre que contiene un texto o está contenido en él"""
+
+    def __init__(self, names: List[str]):
+        """
+        Construye el autómata y el índice de búsqueda inversa.
+
+        Args:
+            names: Nombres a buscar (ya normalizados), en orden de prioridad
+        """
+        # Transiciones, enlaces de falla y menor índice de nombre que termina en cada estado
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[Optional[int]] = [None]
+
+        for index, name in enumerate(names):
+            state = 0
+            for char in name:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._best.append(None)
+                state = next_state
+
+            if self._best[state] is None:
+                self._best[state] = index
+
+        self._build_failure_links()
+
+        # Para buscar el texto dentro de los nombres basta un str.find sobre todos juntos
+        self._joined = _SEPARATOR.join(names)
+        self._offsets: List[int] = []
+        offset = 0
+        for name in names:
+            self._offsets.append(offset)
+            offset += len(name) + 1
+
+    def _build_failure_links(self) -> None:
+        """Calcula los enlaces de falla recorriendo el trie por niveles."""
+        queue = deque(self._goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+
+            # Un estado también reconoce los nombres de su sufijo más largo
+            fail_best = self._best[self._fail[state]]
+            if fail_best is not None and (self._best[state] is None or fail_best < self._best[state]):
+                self._best[state] = fail_best
+
+            for char, next_state in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                queue.append(next_state)
+
+    def find_contained(self, text: str) -> Optional[int]:
+        """
+        Busca el primer nombre que aparece dentro del texto.
+
+        Args:
+            text: Texto a recorrer (ya normalizado)
+
+        Returns:
+            Índice del primer nombre contenido en el texto o None
+        """
+        goto = self._goto
+        fail = self._fail
+        best = self._best
+
+        result = best[0]  # Un nombre vacío está contenido en cualquier texto
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            found = best[state]
+            if found is not None and (result is None or found < result):
+                result = found
+
+        return result
+
+    def find_containing(self, text: str) -> Optional[int]:
+        """
+        Busca el primer nombre que contiene el texto.
+
+        Args:
+            text: Texto a buscar (ya normalizado)
+
+        Returns:
+            Índice del primer nombre que contiene el texto o None
+        """
+        if not self._offsets or _SEPARATOR in text:
+            return None
+
+        position = self._joined.find(text)
+        if position < 0:
+            return None
+        return bisect_right(self._offsets, position) - 1
+
+    def find(self, text: str) -> Optional[int]:
+        """
+        Busca el primer nombre que contiene el texto o está contenido en él.
+
+        Args:
+            text: Texto a buscar (ya normalizado)
+
+        Returns:
+            Índice del primer nombre que coincide o None si no hay coincidencia
+        """
+        matches = [index for index in (self.find_containing(text), self.find_contained(text))
+                   if index is not None]
+        return min(matches) if matches else None
@@ -6,7 +6,7 @@ Módulo para el cálculo de precios sin comisión.
 """
 
 import logging
-from typing import Union, Optional
+from typing import Union, Optional, Iterable, List, Callable
 
 logger = logging.getLogger(__name__)
 
@@ -30,30 +30,127 @@ def calculate_price_without_commission(ml_price: Union[float, str],
         >>> calculate_price_without_commission(113, 15)
         98.26
     """
+    return calculate_prices_without_commission([ml_price], commission_rate, round_to)[0]
+
+def calculate_prices_without_commission(ml_prices: Iterable[Union[float, str]], 
+                                       commission_rate: Union[float, int] = 13,
+                                       round_to: Optional[int] = 2) -> List[float]:
+    """
+    Calcula en bloque los precios sin la comisión de Mercado Libre.
+    
+    El divisor se calcula una sola vez para todos los precios, por lo que
+    conviene usar esta función en lugar de llamar a
+    calculate_price_without_commission para cada producto.
+    
+    Args:
+        ml_prices: Precios en Mercado Libre (con comisión)
+        commission_rate: Porcentaje de comisión (por defecto 13%)
+        round_to: Número de decimales para redondear (None para no redondear)
+        
+    Returns:
+        Lista de precios sin comisión, en el mismo orden (0.0 para precios inválidos)
+    
+    Examples:
+        >>> calculate_prices_without_commission([113, "226", 0])
+        [100.0, 200.0, 0.0]
+    """
     try:
-        # Convertir a float si es string
-        if isinstance(ml_price, str):
-            ml_price = float(ml_price.replace(',', '.'))
-        else:
-            ml_price = float(ml_price)
+        divide = make_commission_divider(commission_rate, round_to)
+    except (ValueError, TypeError) as e:
+        logger.error(f"Error al calcular precio sin comisión: {e}")
+        return [0.0 for _ in ml_prices]
+    
+    divisor = _commission_divisor(commission_rate)
+    
+    # Los precios numéricos válidos (el caso habitual) se calculan en línea,
+    # sin llamar a una función por precio; el resto pasa por la validación completa
+    if round_to is None:
+        return [ml_price / divisor
+                if (type(ml_price) is float or type(ml_price) is int) and ml_price > 0
+                else divide(ml_price)
+                for ml_price in ml_prices]
+    
+    return [round(ml_price / divisor, round_to)
+            if (type(ml_price) is float or type(ml_price) is int) and ml_price > 0
+            else divide(ml_price)
+            for ml_price in ml_prices]
+
+def _commission_divisor(commission_rate: Union[float, int]) -> float:
+    """
+    Calcula el divisor que descuenta la comisión de un precio.
+    
+    Fórmula: precio_sin_comision = precio_con_comision / (1 + comisión)
+    
+    Args:
+        commission_rate: Porcentaje de comisión
         
-        if ml_price <= 0:
-            logger.warning(f"Precio inválido: {ml_price}")
+    Returns:
+        Divisor a aplicar a los precios con comisión
+    
+    Raises:
+        ValueError: Si la comisión no es un número válido
+    """
+    return 1 + float(commission_rate) / 100
+
+def make_commission_divider(commission_rate: Union[float, int] = 13,
+                            round_to: Optional[int] = 2) -> Callable[[Union[float, str]], float]:
+    """
+    Crea una función que descuenta una comisión fija a un precio.
+    
+    El divisor se calcula una única vez al crear la función, de modo que
+    aplicarla dentro de un bucle solo cuesta la división y el redondeo.
+    
+    Args:
+        commission_rate: Porcentaje de comisión (por defecto 13%)
+        round_to: Número de decimales para redondear (None para no redondear)
+        
+    Returns:
+        Función que recibe el precio con comisión y devuelve el precio sin
+        comisión (0.0 para precios inválidos)
+    
+    Raises:
+        ValueError: Si la comisión no es un número válido
+        
+    Examples:
+        >>> divide = make_commission_divider(13)
+        >>> divide(113)
+        100.0
+    """
+    # Convertir porcentaje a factor
+    divisor = _commission_divisor(commission_rate)
+    
+    def divide(ml_price: Union[float, str]) -> float:
+        try:
+            ml_price = parse_price(ml_price)
+        except (ValueError, TypeError) as e:
+            logger.error(f"Error al calcular precio sin comisión: {e}")
             return 0.0
-            
-        # Convertir porcentaje a factor
-        commission_factor = float(commission_rate) / 100
         
-        # Calcular precio sin comisión
-        # Fórmula: precio_sin_comision = precio_con_comision / (1 + comisión)
-        price_without_commission = ml_price / (1 + commission_factor)
+        if ml_price <= 0:
+            if logger.isEnabledFor(logging.WARNING):
+                logger.warning(f"Precio inválido: {ml_price}")
+            return 0.0
         
         # Redondear si se especifica
-        if round_to is not None:
-            price_without_commission = round(price_without_commission, round_to)
-            
-        return price_without_commission
+        if round_to is None:
+            return ml_price / divisor
+        return round(ml_price / divisor, round_to)
+    
+    return divide
+
+def parse_price(value: Union[float, str]) -> float:
+    """
+    Convierte un precio a float, aceptando coma como separador decimal.
+    
+    Args:
+        value: Precio como número o string (por ejemplo "1234,50")
         
-    except (ValueError, TypeError) as e:
-        logger.error(f"Error al calcular precio sin comisión: {e}")
-        return 0.0
+    Returns:
+        Precio como float
+        
+    Raises:
+        ValueError: Si el valor no representa un número
+    """
+    if isinstance(value, str):
+        return float(value.replace(',', '.'))
+    return float(value)
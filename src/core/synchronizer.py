@@ -5,13 +5,20 @@
 Módulo principal para la sincronización de precios entre Mercado Libre y Tienda Nube.
 """
 
-import json
+import os
+import time
 import logging
-from typing import Dict, Any, List, Tuple, Optional
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple, Optional, Callable
 
-from src.api.mercadolibre import MercadoLibreAPI
-from src.api.tiendanube import TiendaNubeAPI
-from src.core.price_calculator import calculate_price_without_commission
+import orjson
+
+from config._loader import load_credentials
+from src.api.mercadolibre_api import MercadoLibreAPI, MLProduct
+from src.api.tiendanube_api import TiendaNubeAPI, build_sku_index
+from src.core.name_matcher import NameMatcher
+from src.core.price_calculator import calculate_prices_without_commission
 
 logger = logging.getLogger(__name__)
 
@@ -34,12 +41,27 @@ class PriceSynchronizer:
         self.dry_run = dry_run
         self.commission_rate = 13  # Valor por defecto
         self.match_by_sku = True   # Por defecto empareja por SKU
+        self.min_price_diff = 0.01 # Diferencia mínima para actualizar un precio
+        self.catalog_cache_ttl = 0    # Vigencia de los catálogos guardados (en segundos, 0 desactiva)
+        self.min_sync_interval = 0    # Tiempo mínimo entre sincronizaciones (en segundos)
+        
+        # Los catálogos descargados se guardan junto al archivo de configuración
+        self.catalog_cache_path = os.path.join(
+            os.path.dirname(os.path.abspath(config_path)), ".catalog_cache.json")
+        self.sync_state_path = os.path.join(
+            os.path.dirname(os.path.abspath(config_path)), ".sync_state.json")
+        
+        # Índices sobre el catálogo de Tienda Nube (se construyen una vez por sincronización)
+        self._indexed_products = None
+        self._sku_index: Dict[str, Dict[str, Any]] = {}
+        self._name_entries: List[Tuple[str, Dict[str, Any]]] = []
+        self._name_matcher: Optional[NameMatcher] = None
         
         # Cargar configuración adicional
         self._load_config(config_path)
         
-        logger.info(f"Sincronizador inicializado con comisión de {self.commission_rate}% " + 
-                   f"y emparejamiento {'por SKU' if self.match_by_sku else 'por nombre'}")
+        logger.info("Sincronizador inicializado con comisión de %s%% y emparejamiento %s",
+                    self.commission_rate, 'por SKU' if self.match_by_sku else 'por nombre')
         
         if self.dry_run:
             logger.info("MODO SIMULACIÓN ACTIVADO: No se realizarán cambios reales")
@@ -52,8 +74,7 @@ class PriceSynchronizer:
             config_path: Ruta al archivo de configuración
         """
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            config = load_credentials(config_path)
             
             # Cargar configuración de sincronización si existe
             if 'settings' in config:
@@ -63,12 +84,62 @@ class PriceSynchronizer:
                 
                 if 'match_by_sku' in settings:
                     self.match_by_sku = settings['match_by_sku']
+                
+                if 'min_price_diff' in settings:
+                    self.min_price_diff = settings['min_price_diff']
+                
+                if 'catalog_cache_ttl' in settings:
+                    self.catalog_cache_ttl = settings['catalog_cache_ttl']
+                
+                if 'min_sync_interval' in settings:
+                    self.min_sync_interval = settings['min_sync_interval']
         
         except Exception as e:
             logger.warning(f"No se pudo cargar la configuración avanzada: {e}")
             logger.warning("Se usarán los valores por defecto")
     
-    def find_matching_product(self, ml_product: Dict[str, Any], 
+    @staticmethod
+    def _get_tn_name(tn_product: Dict[str, Any]) -> str:
+        """
+        Obtiene el nombre en español de un producto o el primer idioma disponible.
+        
+        Args:
+            tn_product: Producto de Tienda Nube
+            
+        Returns:
+            str: Nombre del producto (vacío si no tiene)
+        """
+        names = tn_product.get("name") or {}
+        tn_name = names.get("es", "")
+        if not tn_name and names:
+            # Tomar el primer idioma disponible
+            tn_name = next(iter(names.values()))
+        return tn_name or ""
+    
+    def _build_indexes(self, tn_products: List[Dict[str, Any]]) -> None:
+        """
+        Construye los índices por SKU y por nombre sobre el catálogo de Tienda Nube.
+        
+        Args:
+            tn_products: Lista de productos de Tienda Nube
+        """
+        self._sku_index = build_sku_index(tn_products)
+        
+        self._name_entries = []
+        for tn_product in tn_products:
+            # El nombre normalizado queda guardado en el producto para próximas sincronizaciones
+            tn_name = tn_product.get("_normalized_name")
+            if tn_name is None:
+                tn_name = self._get_tn_name(tn_product).lower()
+                tn_product["_normalized_name"] = tn_name
+            
+            self._name_entries.append((tn_name, tn_product))
+        
+        # El autómata de nombres se construye solo si se llega a buscar por nombre
+        self._name_matcher = None
+        self._indexed_products = tn_products
+    
+    def find_matching_product(self, ml_product: MLProduct, 
                              tn_products: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """
         Encuentra el producto correspondiente en Tienda Nube.
@@ -80,46 +151,175 @@ class PriceSynchronizer:
         Returns:
             Producto de Tienda Nube que coincide o None si no hay coincidencia
         """
-        if self.match_by_sku and ml_product.get("sku"):
-            # Buscar por SKU
-            sku = ml_product["sku"]
-            for tn_product in tn_products:
-                # Verificar SKU en el producto principal
-                if tn_product.get("sku") == sku:
-                    logger.debug(f"Coincidencia por SKU: {sku}")
-                    return tn_product
-                
-                # Verificar SKU en las variantes
-                for variant in tn_product.get("variants", []):
-                    if variant.get("sku") == sku:
-                        logger.debug(f"Coincidencia por SKU en variante: {sku}")
-                        return tn_product
+        # Los índices se reutilizan mientras se consulte la misma lista de productos
+        if self._indexed_products is not tn_products:
+            self._build_indexes(tn_products)
+        
+        if self.match_by_sku and ml_product.sku:
+            # Buscar por SKU (producto principal o variantes)
+            tn_product = self._sku_index.get(ml_product.sku)
+            if tn_product is not None:
+                logger.debug("Coincidencia por SKU: %s", ml_product.sku)
+                return tn_product
         else:
             # Buscar por nombre (más propenso a errores)
-            ml_title = ml_product["title"].lower()
-            for tn_product in tn_products:
-                # Obtener nombre en español o el primer idioma disponible
-                tn_name = tn_product.get("name", {}).get("es", "")
-                if not tn_name and tn_product.get("name"):
-                    # Tomar el primer idioma disponible
-                    for lang, name in tn_product["name"].items():
-                        tn_name = name
-                        break
-                
-                tn_name = tn_name.lower()
-                
-                # Comparar nombres (buscamos coincidencia parcial en cualquier dirección)
-                if ml_title in tn_name or tn_name in ml_title:
-                    logger.debug(f"Coincidencia por nombre: ML '{ml_title}' - TN '{tn_name}'")
-                    return tn_product
+            ml_title = ml_product.title.lower()
+            
+            if self._name_matcher is None:
+                self._name_matcher = NameMatcher([tn_name for tn_name, _ in self._name_entries])
+            
+            # Coincidencia parcial en cualquier dirección (el primer producto en orden)
+            index = self._name_matcher.find(ml_title)
+            if index is not None:
+                tn_name, tn_product = self._name_entries[index]
+                logger.debug("Coincidencia por nombre: ML '%s' - TN '%s'", ml_title, tn_name)
+                return tn_product
         
-        logger.debug(f"No se encontró coincidencia para: {ml_product.get('title')} (SKU: {ml_product.get('sku')})")
         return None
     
-    def sync_prices(self) -> Tuple[int, int, int]:
+    def _load_catalog_cache(self) -> Dict[str, Any]:
+        """
+        Carga los catálogos guardados por ejecuciones anteriores.
+        
+        Returns:
+            dict: Catálogos por plataforma ({"ml": {...}, "tn": {...}}), vacío si no hay
+        """
+        if self.catalog_cache_ttl <= 0:
+            return {}
+        
+        try:
+            with open(self.catalog_cache_path, 'rb') as f:
+                cache = orjson.loads(f.read())
+            
+            if not isinstance(cache, dict):
+                logger.warning("La caché de catálogos tiene un formato inválido, se ignora")
+                return {}
+            return cache
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"No se pudo leer la caché de catálogos: {e}")
+            return {}
+    
+    def _save_catalog_cache(self, cache: Dict[str, Any]) -> None:
+        """
+        Guarda los catálogos para reutilizarlos en las próximas ejecuciones.
+        
+        Args:
+            cache: Catálogos por plataforma
+        """
+        if self.catalog_cache_ttl <= 0:
+            return
+        
+        tmp_path = f"{self.catalog_cache_path}.tmp"
+        
+        try:
+            # Los MLProduct se guardan como listas
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(cache, default=tuple))
+            os.replace(tmp_path, self.catalog_cache_path)
+        except (OSError, TypeError) as e:
+            logger.warning(f"No se pudo guardar la caché de catálogos: {e}")
+    
+    def _cached_get(self, key: str, getter: Callable[[], list],
+                    cache: Dict[str, Any]) -> list:
+        """
+        Obtiene un catálogo desde la caché si sigue vigente o lo descarga.
+        
+        Args:
+            key: Plataforma del catálogo ("ml" o "tn")
+            getter: Función que descarga el catálogo
+            cache: Catálogos guardados; se actualiza con lo descargado
+            
+        Returns:
+            list: Productos del catálogo
+        """
+        products = self._read_cache_entry(key, cache.get(key))
+        if products is not None:
+            logger.info("Usando catálogo guardado de %s (%d productos)", key.upper(), len(products))
+            return products
+        
+        products = getter()
+        
+        # No se guardan catálogos vacíos (pueden deberse a un error de la API)
+        if products:
+            cache[key] = {"saved_at": time.time(), "products": products}
+        return products
+    
+    def _read_cache_entry(self, key: str, entry: Any) -> Optional[list]:
+        """
+        Valida un catálogo guardado y devuelve sus productos si sigue vigente.
+        
+        Args:
+            key: Plataforma del catálogo ("ml" o "tn")
+            entry: Entrada de la caché ({"saved_at": ..., "products": [...]})
+            
+        Returns:
+            Lista de productos o None si no hay entrada, venció o es inválida
+        """
+        if entry is None:
+            return None
+        
+        try:
+            if time.time() - float(entry["saved_at"]) >= self.catalog_cache_ttl:
+                return None
+            
+            rows = entry["products"]
+            if not isinstance(rows, list):
+                raise TypeError("los productos no son una lista")
+            
+            if key == "ml":
+                products = []
+                for row in rows:
+                    if not isinstance(row, list):
+                        raise TypeError(f"producto inválido: {row!r}")
+                    products.append(MLProduct(*row))
+                return products
+            
+            if not all(isinstance(row, dict) for row in rows):
+                raise TypeError("producto inválido")
+            return rows
+        
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Catálogo guardado de {key.upper()} inválido, se descargará de nuevo: {e}")
+            return None
+    
+    def _seconds_since_last_sync(self) -> Optional[float]:
+        """
+        Obtiene el tiempo transcurrido desde la última sincronización real.
+        
+        Returns:
+            Segundos desde la última sincronización o None si no hay registro
+        """
+        try:
+            with open(self.sync_state_path, 'rb') as f:
+                state = orjson.loads(f.read())
+            return time.time() - state["last_sync"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"No se pudo leer el estado de la última sincronización: {e}")
+            return None
+    
+    def _save_sync_state(self) -> None:
+        """Registra el momento de la sincronización actual."""
+        tmp_path = f"{self.sync_state_path}.tmp"
+        
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps({"last_sync": time.time()}))
+            os.replace(tmp_path, self.sync_state_path)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el estado de la sincronización: {e}")
+    
+    def sync_prices(self, force_refresh: bool = False) -> Tuple[int, int, int]:
         """
         Sincroniza los precios entre Mercado Libre y Tienda Nube.
         
+        Args:
+            force_refresh: Si es True, descarga los catálogos aunque haya una copia vigente
+                y sincroniza aunque no haya pasado el intervalo mínimo
+        
         Returns:
             Tupla con (productos_actualizados, productos_sin_cambio, productos_sin_coincidencia)
         """
@@ -128,42 +328,117 @@ class PriceSynchronizer:
         unchanged_count = 0
         unmatched_count = 0
         
-        # Obtener productos de ambas plataformas
-        logger.info("Obteniendo productos de Mercado Libre...")
-        ml_products = self.ml_api.get_products()
+        # Omitir la ejecución si la última sincronización es demasiado reciente
+        if self.min_sync_interval > 0 and not force_refresh:
+            elapsed = self._seconds_since_last_sync()
+            if elapsed is not None and elapsed < self.min_sync_interval:
+                logger.info("Última sincronización hace %d segundos (mínimo %d): se omite esta ejecución",
+                            elapsed, self.min_sync_interval)
+                return 0, 0, 0
+        
+        # Obtener productos de ambas plataformas en paralelo
+        logger.info("Obteniendo productos de Mercado Libre y Tienda Nube...")
+        cache = {} if force_refresh else self._load_catalog_cache()
+        previous = dict(cache)
+        
+        # Sin caché de catálogos, los productos de ML se emparejan a medida que se
+        # descargan y solo se conservan las coincidencias
+        stream_ml = self.catalog_cache_ttl <= 0
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            if stream_ml:
+                # La búsqueda de IDs y los primeros lotes avanzan mientras se descarga TN
+                ml_iter = self.ml_api.iter_products()
+                ml_future = executor.submit(next, ml_iter, None)
+            else:
+                ml_future = executor.submit(self._cached_get, "ml", self.ml_api.get_products, cache)
+            tn_future = executor.submit(self._cached_get, "tn", self.tn_api.get_products, cache)
+            tn_products = tn_future.result()
+            
+            try:
+                ml_products = ml_future.result()
+            except Exception as e:
+                logger.error(f"Error al obtener productos de Mercado Libre: {e}")
+                ml_products = None
+        
+        if stream_ml and ml_products is not None:
+            ml_products = itertools.chain((ml_products,), ml_iter)
+        
+        # Indexar el catálogo de Tienda Nube una sola vez, antes de guardarlo para
+        # que la caché conserve los nombres normalizados
+        self._build_indexes(tn_products)
+        
+        if any(cache[key] is not previous.get(key) for key in cache):
+            self._save_catalog_cache(cache)
         
         if not ml_products:
             logger.warning("No se encontraron productos en Mercado Libre")
             return 0, 0, 0
         
-        logger.info("Obteniendo productos de Tienda Nube...")
-        tn_products = self.tn_api.get_products()
-        
         if not tn_products:
+            if stream_ml:
+                ml_iter.close()
             logger.warning("No se encontraron productos en Tienda Nube")
             return 0, 0, 0
         
-        logger.info(f"Sincronizando {len(ml_products)} productos de Mercado Libre con {len(tn_products)} productos de Tienda Nube")
+        logger.info("Sincronizando productos de Mercado Libre con %d productos de Tienda Nube",
+                    len(tn_products))
         
-        # Para cada producto de Mercado Libre, buscar su correspondiente en Tienda Nube
-        for ml_product in ml_products:
-            # Verificar si el producto está activo
-            if ml_product.get("status") != "active":
-                logger.debug(f"Ignorando producto no activo: {ml_product.get('title')}")
-                continue
-            
-            # Buscar producto correspondiente en Tienda Nube
-            tn_product = self.find_matching_product(ml_product, tn_products)
-            
-            if not tn_product:
-                logger.warning(f"No se encontró coincidencia para: {ml_product.get('title')} (SKU: {ml_product.get('sku')})")
-                unmatched_count += 1
-                continue
-            
-            # Calcular precio sin comisión
-            ml_price = ml_product.get("price", 0)
-            new_price = calculate_price_without_commission(ml_price, self.commission_rate)
-            
+        # Para cada producto activo de Mercado Libre, buscar su correspondiente en Tienda Nube
+        matches: List[Tuple[MLProduct, Dict[str, Any]]] = []
+        ml_count = 0
+        inactive_count = 0
+        
+        try:
+            for ml_product in ml_products:
+                ml_count += 1
+                
+                # Solo se sincronizan los productos activos
+                if ml_product.status != "active":
+                    inactive_count += 1
+                    continue
+                
+                # Buscar producto correspondiente en Tienda Nube
+                tn_product = self.find_matching_product(ml_product, tn_products)
+                
+                if not tn_product:
+                    logger.warning("No se encontró coincidencia para: %s (SKU: %s)",
+                                   ml_product.title, ml_product.sku,
+                                   extra={"ml_id": ml_product.id, "title": ml_product.title,
+                                          "sku": ml_product.sku})
+                    unmatched_count += 1
+                    continue
+                
+                matches.append((ml_product, tn_product))
+        
+        except Exception as e:
+            # Un catálogo incompleto no se sincroniza, igual que si falla la descarga
+            logger.error(f"Error al obtener productos de Mercado Libre: {e}")
+            return 0, 0, 0
+        
+        logger.info("Se recorrieron %d productos de Mercado Libre", ml_count)
+        if inactive_count:
+            logger.info("Ignorando %d productos no activos de Mercado Libre", inactive_count)
+        
+        # Calcular todos los precios sin comisión de una vez
+        new_prices = calculate_prices_without_commission(
+            [ml_product.price for ml_product, _ in matches], self.commission_rate)
+        
+        # Varios productos de ML pueden apuntar al mismo producto de TN: se guarda
+        # solo el último precio de cada uno, como en la ejecución en serie
+        last_prices: Dict[Any, Tuple[Dict[str, Any], float]] = {}
+        for (ml_product, tn_product), new_price in zip(matches, new_prices):
+            replaced = last_prices.get(tn_product["id"])
+            if replaced is not None:
+                logger.debug("Precio %s reemplazado por %s para el producto %s",
+                             replaced[1], new_price, tn_product["id"])
+                unchanged_count += 1
+            last_prices[tn_product["id"]] = (tn_product, new_price)
+        
+        # Productos simples cuyo precio cambió (se actualizan en paralelo al final)
+        pending: List[Tuple[Dict[str, Any], float, float]] = []
+        
+        for tn_product, new_price in last_prices.values():
             # Verificar si hay variantes o es un producto simple
             if tn_product.get("variants") and len(tn_product["variants"]) > 0:
                 # Producto con variantes
@@ -176,31 +451,62 @@ class PriceSynchronizer:
                 # Producto simple
                 current_price = float(tn_product.get("price", 0))
                 
-                # Comparar precios con una tolerancia de 0.01 para evitar cambios innecesarios
-                if abs(current_price - new_price) > 0.01:
-                    logger.info(f"Actualizando precio de '{tn_product.get('name', {}).get('es', 'Producto')}' " +
-                              f"de {current_price} a {new_price}")
-                    
-                    success = self.tn_api.update_product_price(tn_product["id"], new_price, self.dry_run)
-                    
-                    if success:
-                        updated_count += 1
-                    else:
-                        logger.error(f"Error al actualizar precio del producto {tn_product['id']}")
+                # Comparar precios con una tolerancia para evitar cambios innecesarios
+                if abs(current_price - new_price) > self.min_price_diff:
+                    pending.append((tn_product, current_price, new_price))
                 else:
-                    logger.debug(f"Precio sin cambios para '{tn_product.get('name', {}).get('es', 'Producto')}': {current_price}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Precio sin cambios para '%s': %s",
+                                     tn_product.get('name', {}).get('es', 'Producto'), current_price)
                     unchanged_count += 1
         
+        # Las peticiones se solapan; el limitador de la API regula el ritmo
+        if pending:
+            workers = min(len(pending), self.tn_api.max_workers)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                updated_count += sum(executor.map(self._update_simple_price, pending))
+        
+        # Los precios de Tienda Nube cambiaron: el catálogo guardado ya no es válido
+        if updated_count and not self.dry_run and cache.pop("tn", None) is not None:
+            self._save_catalog_cache(cache)
+        
+        # Las simulaciones no cuentan para el intervalo mínimo
+        if self.min_sync_interval > 0 and not self.dry_run:
+            self._save_sync_state()
+        
         # Mostrar resumen
         logger.info("=" * 50)
         logger.info("Resumen de sincronización:")
-        logger.info(f"- Productos actualizados: {updated_count}")
-        logger.info(f"- Productos sin cambios: {unchanged_count}")
-        logger.info(f"- Productos sin coincidencia: {unmatched_count}")
+        logger.info("- Productos actualizados: %d", updated_count)
+        logger.info("- Productos sin cambios: %d", unchanged_count)
+        logger.info("- Productos sin coincidencia: %d", unmatched_count)
         logger.info("=" * 50)
         
         return updated_count, unchanged_count, unmatched_count
     
+    def _update_simple_price(self, update: Tuple[Dict[str, Any], float, float]) -> bool:
+        """
+        Actualiza el precio de un producto simple (sin variantes) en Tienda Nube.
+        
+        Args:
+            update: Tupla con (producto de Tienda Nube, precio actual, nuevo precio)
+            
+        Returns:
+            True si la actualización fue exitosa, False en caso contrario
+        """
+        tn_product, current_price, new_price = update
+        
+        logger.info("Actualizando precio de '%s' de %s a %s",
+                    tn_product.get('name', {}).get('es', 'Producto'), current_price, new_price)
+        
+        success = self.tn_api.update_product_price(
+            tn_product["id"], new_price, self.dry_run,
+            current_price=current_price, min_diff=self.min_price_diff)
+        
+        if not success:
+            logger.error(f"Error al actualizar precio del producto {tn_product['id']}")
+        return success
+    
     def _update_variant_prices(self, tn_product: Dict[str, Any], base_price: float) -> bool:
         """
         Actualiza los precios de las variantes de un producto en Tienda Nube.
@@ -220,90 +526,46 @@ class PriceSynchronizer:
             logger.warning(f"El producto {product_id} está marcado con variantes pero no tiene ninguna")
             return False
         
-        # Si hay solo una variante, actualizamos con el precio base
+        # Calcular el nuevo precio de cada variante
         if len(variants) == 1:
+            # Si hay solo una variante, actualizamos con el precio base
             variant = variants[0]
             current_price = float(variant.get("price", 0))
             
-            if abs(current_price - base_price) > 0.01:
-                logger.info(f"Actualizando precio de variante única de '{product_name}' " +
-                          f"de {current_price} a {base_price}")
-                
-                # Preparar payload para actualizar la variante
-                url = f"{self.tn_api.base_url}/products/{product_id}/variants/{variant['id']}"
-                payload = {
-                    "price": base_price
-                }
-                
-                if self.dry_run:
-                    logger.info(f"[SIMULACIÓN] Actualizando precio de variante {variant['id']} a {base_price}")
-                    return True
-                
-                try:
-                    # Esperar para no exceder el límite de la API
-                    import time
-                    time.sleep(self.tn_api.rate_limit)
-                    
-                    response = requests.put(url, headers=self.tn_api.headers, json=payload)
-                    response.raise_for_status()
-                    
-                    logger.info(f"Precio actualizado para la variante {variant['id']} a {base_price}")
-                    return True
-                except Exception as e:
-                    logger.error(f"Error al actualizar precio de la variante {variant['id']}: {e}")
-                    return False
-            else:
-                logger.debug(f"Precio sin cambios para variante única de '{product_name}': {current_price}")
+            if abs(current_price - base_price) <= self.min_price_diff:
+                logger.debug("Precio sin cambios para variante única de '%s': %s", product_name, current_price)
                 return False
+            
+            logger.info("Actualizando precio de variante única de '%s' de %s a %s",
+                        product_name, current_price, base_price)
+            updates = [(variant["id"], base_price)]
+        else:
+            # Si hay múltiples variantes, necesitamos calcular los precios relativos
+            # Para simplificar, mantenemos la misma proporción entre variantes
+            
+            # Calcular precio promedio actual de las variantes
+            current_prices = [float(v.get("price", 0)) for v in variants]
+            avg_price = sum(current_prices) / len(current_prices)
+            
+            if avg_price == 0:
+                logger.warning(f"El producto {product_id} tiene variantes con precio promedio 0")
+                return False
+            
+            # Calcular factor de ajuste
+            adjustment_factor = base_price / avg_price
+            
+            updates = []
+            for variant, current_price in zip(variants, current_prices):
+                variant_id = variant["id"]
+                new_price = round(current_price * adjustment_factor, 2)
+                
+                if abs(current_price - new_price) > self.min_price_diff:
+                    logger.info("Actualizando precio de variante %s de '%s' de %s a %s",
+                                variant_id, product_name, current_price, new_price)
+                    updates.append((variant_id, new_price))
         
-        # Si hay múltiples variantes, necesitamos calcular los precios relativos
-        # Para simplificar, mantenemos la misma proporción entre variantes
-        
-        # Calcular precio promedio actual de las variantes
-        current_prices = [float(v.get("price", 0)) for v in variants]
-        avg_price = sum(current_prices) / len(current_prices)
-        
-        if avg_price == 0:
-            logger.warning(f"El producto {product_id} tiene variantes con precio promedio 0")
+        if not updates:
             return False
         
-        # Calcular factor de ajuste
-        adjustment_factor = base_price / avg_price
-        
-        # Actualizar cada variante
-        any_updated = False
-        
-        for variant in variants:
-            variant_id = variant["id"]
-            current_price = float(variant.get("price", 0))
-            new_price = round(current_price * adjustment_factor, 2)
-            
-            if abs(current_price - new_price) > 0.01:
-                logger.info(f"Actualizando precio de variante {variant_id} de '{product_name}' " +
-                          f"de {current_price} a {new_price}")
-                
-                # Preparar payload para actualizar la variante
-                url = f"{self.tn_api.base_url}/products/{product_id}/variants/{variant_id}"
-                payload = {
-                    "price": new_price
-                }
-                
-                if self.dry_run:
-                    logger.info(f"[SIMULACIÓN] Actualizando precio de variante {variant_id} a {new_price}")
-                    any_updated = True
-                    continue
-                
-                try:
-                    # Esperar para no exceder el límite de la API
-                    import time
-                    time.sleep(self.tn_api.rate_limit)
-                    
-                    response = requests.put(url, headers=self.tn_api.headers, json=payload)
-                    response.raise_for_status()
-                    
-                    logger.info(f"Precio actualizado para la variante {variant_id} a {new_price}")
-                    any_updated = True
-                except Exception as e:
-                    logger.error(f"Error al actualizar precio de la variante {variant_id}: {e}")
-        
-        return any_updated
+        # Enviar todas las actualizaciones del producto en una sola petición
+        return self.tn_api.update_variant_prices(product_id, updates, self.dry_run)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Utilidades para procesar tareas en paralelo con un límite de tareas en curso.
+"""
+
+from collections import deque
+from concurrent.futures import Executor
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+def iter_bounded(executor: Executor, fn: Callable[[T], R], items: Iterable[T],
+                 window: int) -> Iterator[R]:
+    """
+    Aplica una función en paralelo devolviendo los resultados en orden.
+
+    A diferencia de executor.map, nunca hay más de `window` tareas enviadas
+    sin consumir, así que solo se mantienen en memoria esos resultados. Si el
+    consumidor deja de iterar, las tareas que aún no empezaron se cancelan.
+
+    Args:
+        executor: Ejecutor donde se envían las tareas
+        fn: Función a aplicar a cada elemento
+        items: Elementos a procesar
+        window: Cantidad máxima de tareas en curso
+
+    Yields:
+        Resultado de la función para cada elemento, en el orden original
+    """
+    items = iter(items)
+    pending = deque()
+
+    try:
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= window:
+                break
+
+        while pending:
+            result = pending.popleft().result()
+
+            # Reponer la ventana antes de entregar el resultado
+            for item in items:
+                pending.append(executor.submit(fn, item))
+                break
+
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
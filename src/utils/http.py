@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Creación de sesiones HTTP compartidas para los clientes de API.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Respuestas que se reintentan automáticamente (límite de peticiones y errores del servidor)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+def create_session(pool_size: int = 10) -> requests.Session:
+    """
+    Crea una sesión con pool de conexiones y reintentos automáticos.
+
+    Ante un 429 o 503 se espera exactamente lo indicado por el encabezado
+    Retry-After; en el resto de los errores se usa espera exponencial.
+    Además de los métodos idempotentes se reintenta PATCH, que se usa para
+    fijar precios (repetir la petición no cambia el resultado).
+    
+    Si hay más hilos que conexiones en el pool, los hilos esperan a que se
+    libere una conexión abierta en lugar de abrir conexiones descartables.
+
+    Args:
+        pool_size: Cantidad de conexiones que se mantienen abiertas por host
+
+    Returns:
+        requests.Session: Sesión configurada
+    """
+    retries = Retry(
+        total=5,
+        backoff_factor=0.3,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"PATCH"},
+        respect_retry_after_header=True
+    )
+
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=retries, pool_block=True)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
@@ -6,6 +6,8 @@ Configuración del sistema de logging para ML-TN-Sync.
 """
 
 import os
+import queue
+import atexit
 import logging
 import logging.handlers
 from datetime import datetime
@@ -15,8 +17,17 @@ from pathlib import Path
 ROOT_DIR = Path(__file__).parent.parent.parent
 LOG_DIR = os.path.join(ROOT_DIR, "logs")
 
-# Asegurar que el directorio de logs existe
-os.makedirs(LOG_DIR, exist_ok=True)
+# Hilo que escribe los registros en consola y archivo
+_listener = None
+
+def _stop_listener():
+    """Detiene el hilo de logging vaciando los registros pendientes."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(_stop_listener)
 
 def setup_logger(level=logging.INFO, log_file=None):
     """
@@ -29,11 +40,15 @@ def setup_logger(level=logging.INFO, log_file=None):
     Returns:
         logging.Logger: Logger configurado
     """
+    global _listener
+    
     # Si no se especifica un archivo de log, usar uno con la fecha actual
     if not log_file:
         date_str = datetime.now().strftime("%Y-%m-%d")
         log_file = f"ml_tn_sync_{date_str}.log"
     
+    # Asegurar que el directorio de logs existe
+    os.makedirs(LOG_DIR, exist_ok=True)
     log_path = os.path.join(LOG_DIR, log_file)
     
     # Crear logger raíz
@@ -41,6 +56,7 @@ def setup_logger(level=logging.INFO, log_file=None):
     logger.setLevel(level)
     
     # Limpiar handlers existentes
+    _stop_listener()
     if logger.handlers:
         logger.handlers.clear()
     
@@ -54,7 +70,6 @@ def setup_logger(level=logging.INFO, log_file=None):
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
     console_handler.setLevel(level)
-    logger.addHandler(console_handler)
     
     # Handler para archivo
     file_handler = logging.handlers.RotatingFileHandler(
@@ -65,7 +80,13 @@ def setup_logger(level=logging.INFO, log_file=None):
     )
     file_handler.setFormatter(formatter)
     file_handler.setLevel(level)
-    logger.addHandler(file_handler)
+    
+    # Los registros se encolan y un hilo aparte los escribe, sin bloquear la sincronización
+    log_queue = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
     
     # Log inicial
     logger.info(f"Logger inicializado con nivel {logging.getLevelName(level)}")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Limitador de peticiones compartido entre hilos para los clientes de API.
+"""
+
+import time
+import threading
+
+
+class TokenBucket:
+    """Limitador de tipo token bucket seguro para uso entre hilos"""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        """
+        Inicializa el limitador.
+
+        Args:
+            rate: Tokens generados por segundo (peticiones por segundo permitidas)
+            capacity: Cantidad máxima de tokens acumulables (ráfaga máxima)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._timestamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_interval(cls, interval: float, capacity: float = 1) -> "TokenBucket":
+        """
+        Crea un limitador a partir del tiempo mínimo entre peticiones.
+
+        Args:
+            interval: Tiempo entre peticiones (segundos). 0 desactiva el límite
+            capacity: Cantidad máxima de tokens acumulables
+
+        Returns:
+            TokenBucket configurado
+        """
+        rate = 1.0 / interval if interval and interval > 0 else float("inf")
+        return cls(rate, capacity)
+
+    def acquire(self) -> None:
+        """Bloquea hasta que haya un token disponible y lo consume"""
+        if self.rate == float("inf"):
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity,
+                                   self._tokens + (now - self._timestamp) * self.rate)
+                self._timestamp = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
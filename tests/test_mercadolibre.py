@@ -14,7 +14,7 @@ from unittest import mock
 # Agregar el directorio raíz al path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.api.mercadolibre import MercadoLibreAPI
+from src.api.mercadolibre_api import MercadoLibreAPI
 
 class TestMercadoLibreAPI(unittest.TestCase):
     """Pruebas para la clase MercadoLibreAPI"""
@@ -34,22 +34,28 @@ class TestMercadoLibreAPI(unittest.TestCase):
         self.config_path = "test_config.json"
         with open(self.config_path, 'w') as f:
             json.dump(self.test_config, f)
+        
+        # El token se guarda junto al archivo de configuración
+        self.token_cache_path = os.path.abspath(".ml_token_cache.json")
+        if os.path.exists(self.token_cache_path):
+            os.remove(self.token_cache_path)
     
     def tearDown(self):
         """Limpieza después de cada prueba"""
-        # Eliminar archivo de configuración temporal
-        if os.path.exists(self.config_path):
-            os.remove(self.config_path)
+        # Eliminar archivos temporales
+        for path in (self.config_path, self.token_cache_path, f"{self.config_path}.lock"):
+            if os.path.exists(path):
+                os.remove(path)
     
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_refresh_access_token(self, mock_post):
         """Prueba la función de actualización del token de acceso"""
         # Configurar el mock para la respuesta de la API
         mock_response = mock.Mock()
-        mock_response.json.return_value = {
+        mock_response.content = json.dumps({
             "access_token": "new_access_token",
             "refresh_token": "new_refresh_token"
-        }
+        }).encode()
         mock_response.raise_for_status.return_value = None
         mock_post.return_value = mock_response
         
@@ -66,78 +72,157 @@ class TestMercadoLibreAPI(unittest.TestCase):
         self.assertEqual(kwargs['data']['client_id'], "test_client_id")
         self.assertEqual(kwargs['data']['client_secret'], "test_client_secret")
         self.assertEqual(kwargs['data']['refresh_token'], "test_refresh_token")
+        
+        # Verificar que el nuevo refresh token se haya guardado en la configuración
+        with open(self.config_path) as f:
+            saved_config = json.load(f)
+        self.assertEqual(saved_config["mercadolibre"]["refresh_token"], "new_refresh_token")
+        self.assertEqual(saved_config["mercadolibre"]["client_id"], "test_client_id")
+    
+    @mock.patch('requests.Session.post')
+    def test_cached_access_token(self, mock_post):
+        """Prueba que se reutilice el token guardado mientras esté vigente"""
+        mock_response = mock.Mock()
+        mock_response.content = json.dumps({
+            "access_token": "new_access_token",
+            "refresh_token": "new_refresh_token",
+            "expires_in": 21600
+        }).encode()
+        mock_response.raise_for_status.return_value = None
+        mock_post.return_value = mock_response
+        
+        # La primera instancia refresca y guarda el token
+        MercadoLibreAPI(config_path=self.config_path)
+        self.assertTrue(os.path.exists(self.token_cache_path))
+        
+        # La segunda instancia usa el token guardado sin llamar a la API
+        api = MercadoLibreAPI(config_path=self.config_path)
+        self.assertEqual(api.access_token, "new_access_token")
+        self.assertEqual(api.refresh_token, "new_refresh_token")
+        mock_post.assert_called_once()
     
-    @mock.patch('requests.get')
-    @mock.patch('src.api.mercadolibre.MercadoLibreAPI.refresh_access_token')
+    @mock.patch('requests.Session.post')
+    def test_cached_access_token_keeps_configured_refresh_token(self, mock_post):
+        """Prueba que el token guardado no reemplace un refresh token nuevo de la configuración"""
+        mock_response = mock.Mock()
+        mock_response.content = json.dumps({
+            "access_token": "new_access_token",
+            "refresh_token": "new_refresh_token",
+            "expires_in": 21600
+        }).encode()
+        mock_response.raise_for_status.return_value = None
+        mock_post.return_value = mock_response
+        
+        MercadoLibreAPI(config_path=self.config_path)
+        
+        # El usuario vuelve a autorizar la aplicación y pega un refresh token nuevo
+        self.test_config["mercadolibre"]["refresh_token"] = "pasted_refresh_token"
+        with open(self.config_path, 'w') as f:
+            json.dump(self.test_config, f)
+        
+        api = MercadoLibreAPI(config_path=self.config_path)
+        self.assertEqual(api.access_token, "new_access_token")
+        self.assertEqual(api.refresh_token, "pasted_refresh_token")
+        
+        # El archivo del token no guarda el refresh token
+        with open(self.token_cache_path) as f:
+            self.assertNotIn("refresh_token", json.load(f))
+    
+    @mock.patch('requests.Session.request')
+    @mock.patch('src.api.mercadolibre_api.MercadoLibreAPI.refresh_access_token')
     def test_get_products(self, mock_refresh, mock_get):
         """Prueba la función de obtención de productos"""
         # Configurar mocks para las respuestas de la API
         mock_response_search = mock.Mock()
-        mock_response_search.json.return_value = {
+        mock_response_search.content = json.dumps({
             "results": ["ML123", "ML456"],
             "paging": {"total": 2}
-        }
+        }).encode()
         mock_response_search.raise_for_status.return_value = None
         
-        mock_response_detail1 = mock.Mock()
-        mock_response_detail1.json.return_value = {
-            "id": "ML123",
-            "title": "Producto 1",
-            "price": 100,
-            "currency_id": "ARS",
-            "attributes": [{"id": "SELLER_SKU", "value_name": "SKU123"}],
-            "permalink": "http://permalink1.com"
-        }
-        mock_response_detail1.raise_for_status.return_value = None
-        
-        mock_response_detail2 = mock.Mock()
-        mock_response_detail2.json.return_value = {
-            "id": "ML456",
-            "title": "Producto 2",
-            "price": 200,
-            "currency_id": "ARS",
-            "attributes": [{"id": "SELLER_SKU", "value_name": "SKU456"}],
-            "permalink": "http://permalink2.com"
-        }
-        mock_response_detail2.raise_for_status.return_value = None
+        # El endpoint multiget devuelve cada item envuelto en {"code", "body"}
+        mock_response_details = mock.Mock()
+        mock_response_details.content = json.dumps([
+            {
+                "code": 200,
+                "body": {
+                    "id": "ML123",
+                    "title": "Producto 1",
+                    "price": 100,
+                    "currency_id": "ARS",
+                    "attributes": [{"id": "SELLER_SKU", "value_name": "SKU123"}],
+                    "permalink": "http://permalink1.com"
+                }
+            },
+            {
+                "code": 200,
+                "body": {
+                    "id": "ML456",
+                    "title": "Producto 2",
+                    "price": 200,
+                    "currency_id": "ARS",
+                    "attributes": [{"id": "SELLER_SKU", "value_name": "SKU456"}],
+                    "permalink": "http://permalink2.com"
+                }
+            }
+        ]).encode()
+        mock_response_details.raise_for_status.return_value = None
         
         # Configurar el comportamiento del mock para devolver diferentes respuestas
         mock_get.side_effect = [
             mock_response_search,
-            mock_response_detail1,
-            mock_response_detail2
+            mock_response_details
         ]
         
         # Crear instancia de API con el archivo de configuración temporal
         api = MercadoLibreAPI(config_path=self.config_path)
-        api.get_product_details = mock.MagicMock(side_effect=[
-            {
-                "id": "ML123",
-                "title": "Producto 1",
-                "price": 100,
-                "currency_id": "ARS",
-                "sku": "SKU123",
-                "permalink": "http://permalink1.com"
-            },
-            {
-                "id": "ML456",
-                "title": "Producto 2",
-                "price": 200,
-                "currency_id": "ARS",
-                "sku": "SKU456",
-                "permalink": "http://permalink2.com"
-            }
-        ])
         
         # Ejecutar la función a probar
         products = api.get_products()
         
         # Verificar resultados
         self.assertEqual(len(products), 2)
-        self.assertEqual(products[0]["id"], "ML123")
-        self.assertEqual(products[0]["title"], "Producto 1")
-        self.assertEqual(products[1]["id"], "ML456")
-        self.assertEqual(products[1]["title"], "Producto 2")
+        self.assertEqual(products[0].id, "ML123")
+        self.assertEqual(products[0].title, "Producto 1")
+        self.assertEqual(products[1].id, "ML456")
+        self.assertEqual(products[1].title, "Producto 2")
+        self.assertEqual(products[0].sku, "SKU123")
+        self.assertEqual(products[1].sku, "SKU456")
+        
+        # Verificar que los detalles se hayan pedido en una sola petición
+        self.assertEqual(mock_get.call_count, 2)
+        args, kwargs = mock_get.call_args_list[0]
+        self.assertEqual(kwargs['params']['search_type'], "scan")
+        args, kwargs = mock_get.call_args_list[1]
+        self.assertEqual(kwargs['params']['ids'], "ML123,ML456")
+    
+    @mock.patch('requests.Session.request')
+    @mock.patch('src.api.mercadolibre_api.MercadoLibreAPI.refresh_access_token')
+    def test_get_products_details_skips_broken_item(self, mock_refresh, mock_get):
+        """Prueba que un item incompleto no descarte el resto del lote"""
+        mock_response = mock.Mock()
+        mock_response.content = json.dumps([
+            {"code": 200, "body": {"id": "ML123", "title": "Sin precio"}},
+            {
+                "code": 200,
+                "body": {
+                    "id": "ML456",
+                    "title": "Producto 2",
+                    "price": 200,
+                    "currency_id": "ARS",
+                    "attributes": [],
+                    "permalink": "http://permalink2.com"
+                }
+            }
+        ]).encode()
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+        
+        api = MercadoLibreAPI(config_path=self.config_path)
+        products = api.get_products_details(["ML123", "ML456"])
+        
+        self.assertEqual([p.id for p in products], ["ML456"])
+        self.assertIsNone(products[0].sku)
 
 if __name__ == '__main__':
     unittest.main()
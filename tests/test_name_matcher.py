@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas unitarias para el módulo de coincidencia de nombres.
+"""
+
+import os
+import sys
+import unittest
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.name_matcher import NameMatcher
+
+class TestNameMatcher(unittest.TestCase):
+    """Pruebas para la clase NameMatcher"""
+
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        self.names = ["remera azul grande", "pantalón", "remera", "buzo con capucha"]
+        self.matcher = NameMatcher(self.names)
+
+    def test_find_contained(self):
+        """Prueba la búsqueda de nombres contenidos en un título"""
+        self.assertEqual(self.matcher.find_contained("remera roja"), 2)
+        self.assertEqual(self.matcher.find_contained("pantalón largo"), 1)
+        self.assertIsNone(self.matcher.find_contained("campera"))
+
+    def test_find_containing(self):
+        """Prueba la búsqueda de nombres que contienen un título"""
+        self.assertEqual(self.matcher.find_containing("azul"), 0)
+        self.assertEqual(self.matcher.find_containing("capucha"), 3)
+        self.assertIsNone(self.matcher.find_containing("campera"))
+
+    def test_find_returns_first_in_order(self):
+        """Prueba que se devuelva el primer nombre en orden, como la búsqueda lineal"""
+        for title in ["remera", "remera azul grande xl", "buzo", "pantalón corto", "", "nada"]:
+            expected = next((i for i, name in enumerate(self.names)
+                             if title in name or name in title), None)
+            self.assertEqual(self.matcher.find(title), expected)
+
+    def test_empty_name_matches_everything(self):
+        """Prueba que un nombre vacío coincida con cualquier título"""
+        matcher = NameMatcher(["gorra", ""])
+        self.assertEqual(matcher.find("campera"), 1)
+        self.assertEqual(matcher.find("gorra"), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas unitarias para el módulo de cálculo de precios.
+"""
+
+import os
+import sys
+import unittest
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.price_calculator import (
+    calculate_price_without_commission,
+    calculate_prices_without_commission,
+    make_commission_divider,
+    parse_price
+)
+
+class TestPriceCalculator(unittest.TestCase):
+    """Pruebas para las funciones de cálculo de precios"""
+
+    def test_calculate_price_without_commission(self):
+        """Prueba el cálculo de un precio individual"""
+        self.assertEqual(calculate_price_without_commission(113), 100.0)
+        self.assertEqual(calculate_price_without_commission(113, 15), 98.26)
+        self.assertEqual(calculate_price_without_commission("113,00"), 100.0)
+        self.assertEqual(calculate_price_without_commission(-5), 0.0)
+        self.assertEqual(calculate_price_without_commission("abc"), 0.0)
+
+    def test_calculate_prices_without_commission(self):
+        """Prueba el cálculo en bloque de precios"""
+        prices = calculate_prices_without_commission([113, "226", 0, None], 13)
+
+        # Los precios inválidos se devuelven como 0.0 sin interrumpir el resto
+        self.assertEqual(prices, [100.0, 200.0, 0.0, 0.0])
+
+        # Sin redondeo se devuelve el valor exacto
+        prices = calculate_prices_without_commission([100], 15, round_to=None)
+        self.assertAlmostEqual(prices[0], 100 / 1.15)
+
+    def test_make_commission_divider(self):
+        """Prueba la función de descuento con comisión precalculada"""
+        divide = make_commission_divider(15)
+
+        self.assertEqual(divide(113), 98.26)
+        self.assertEqual(divide("113,00"), 98.26)
+        self.assertEqual(divide(0), 0.0)
+        self.assertEqual(divide("abc"), 0.0)
+
+        # Una comisión inválida se detecta al crear la función
+        with self.assertRaises(ValueError):
+            make_commission_divider("abc")
+
+    def test_parse_price(self):
+        """Prueba la conversión de precios con coma decimal"""
+        self.assertEqual(parse_price("1234,50"), 1234.5)
+        self.assertEqual(parse_price(10), 10.0)
+
+if __name__ == '__main__':
+    unittest.main()
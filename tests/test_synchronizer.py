@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas unitarias para el módulo de sincronización de precios.
+"""
+
+import os
+import sys
+import unittest
+import json
+import time
+import shutil
+import tempfile
+from unittest import mock
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.mercadolibre_api import MLProduct
+from src.core.synchronizer import PriceSynchronizer
+
+class TestPriceSynchronizer(unittest.TestCase):
+    """Pruebas para la clase PriceSynchronizer"""
+
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        # Directorio temporal para la configuración y los archivos de caché
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.tmp_dir, "credentials.json")
+        self.write_config({"ml_commission": 0, "catalog_cache_ttl": 0})
+
+        # Sin caché de catálogos se recorren los productos de ML con iter_products
+        self.ml_api = mock.Mock()
+        self.ml_api.iter_products.side_effect = lambda: iter(self.ml_api.get_products.return_value)
+        self.tn_api = mock.Mock(max_workers=4)
+        self.tn_api.update_product_price.return_value = True
+
+    def tearDown(self):
+        """Limpieza después de cada prueba"""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def write_config(self, settings):
+        """Escribe el archivo de configuración con los ajustes indicados"""
+        with open(self.config_path, 'w') as f:
+            json.dump({"settings": settings}, f)
+
+    def make_ml_product(self, item_id, price, sku="SKU1", title="Producto"):
+        """Crea un producto activo de Mercado Libre"""
+        return MLProduct(item_id, title, price, "ARS", sku, "http://permalink", status="active")
+
+    def test_last_listing_wins_for_shared_tn_product(self):
+        """Prueba que con varios productos de ML para un mismo producto de TN gane el último"""
+        self.ml_api.get_products.return_value = [
+            self.make_ml_product("ML1", 100),
+            self.make_ml_product("ML2", 200)
+        ]
+        self.tn_api.get_products.return_value = [
+            {"id": 1, "sku": "SKU1", "price": "50", "variants": []}
+        ]
+
+        synchronizer = PriceSynchronizer(self.ml_api, self.tn_api, config_path=self.config_path)
+        updated, unchanged, unmatched = synchronizer.sync_prices()
+
+        # Solo se envía una petición, con el precio del último producto
+        self.tn_api.update_product_price.assert_called_once()
+        args, kwargs = self.tn_api.update_product_price.call_args
+        self.assertEqual(args[:2], (1, 200.0))
+        self.assertEqual((updated, unchanged, unmatched), (1, 1, 0))
+
+    def test_last_listing_wins_when_price_returns(self):
+        """Prueba que si el último producto de ML repite el precio actual de TN no se actualice"""
+        # Tres productos de ML por producto de TN (uno simple y uno con variantes)
+        self.ml_api.get_products.return_value = [
+            self.make_ml_product(f"ML{sku}{i}", price, sku=sku)
+            for sku in ("SKU1", "SKU2")
+            for i, price in enumerate((100, 90, 100))
+        ]
+        self.tn_api.get_products.return_value = [
+            {"id": 1, "sku": "SKU1", "price": "100", "variants": []},
+            {"id": 2, "variants": [{"id": 20, "sku": "SKU2", "price": "100"}]}
+        ]
+
+        synchronizer = PriceSynchronizer(self.ml_api, self.tn_api, config_path=self.config_path)
+
+        self.assertEqual(synchronizer.sync_prices(), (0, 6, 0))
+        self.tn_api.update_product_price.assert_not_called()
+        self.tn_api.update_variant_prices.assert_not_called()
+
+    def test_ml_products_streamed_without_cache(self):
+        """Prueba que sin caché de catálogos no se arme la lista de productos de ML"""
+        self.prepare_catalogs()
+
+        synchronizer = PriceSynchronizer(self.ml_api, self.tn_api, config_path=self.config_path)
+
+        self.assertEqual(synchronizer.sync_prices(), (0, 1, 0))
+        self.ml_api.iter_products.assert_called_once()
+        self.ml_api.get_products.assert_not_called()
+
+    def test_ml_stream_error_skips_sync(self):
+        """Prueba que si falla la descarga de ML a mitad del recorrido no se actualice nada"""
+        def iter_products():
+            yield self.make_ml_product("ML1", 200)
+            raise ConnectionError("conexión interrumpida")
+
+        self.ml_api.iter_products.side_effect = iter_products
+        self.tn_api.get_products.return_value = [
+            {"id": 1, "sku": "SKU1", "price": "100", "variants": []}
+        ]
+
+        synchronizer = PriceSynchronizer(self.ml_api, self.tn_api, config_path=self.config_path)
+
+        self.assertEqual(synchronizer.sync_prices(), (0, 0, 0))
+        self.tn_api.update_product_price.assert_not_called()
+
+    def test_name_match_keeps_catalog_order(self):
+        """Prueba que por nombre se elija el primer producto en orden, aunque otro coincida exactamente"""
+        synchronizer = PriceSynchronizer(self.ml_api, self.tn_api, config_path=self.config_path)
+        synchronizer.match_by_sku = False
+
+        tn_products = [
+            {"id": 1, "name": {"es": "Remera Azul"}},
+            {"id": 2, "name": {"es": "Remera"}}
+        ]
+        ml_product = self.make_ml_product("ML1", 100, sku=None, title="Remera")
+
+        self.assertEqual(synchronizer.find_matching_product(ml_product, tn_products)["id"], 1)
+
+    def prepare_catalogs(self):
+        """Configura catálogos simples en ambas APIs"""
+        self.ml_api.get_products.return_value = [self.make_ml_product("ML1", 100)]
+        self.tn_api.get_products.return_value = [
+            {"id": 1, "sku": "SKU1", "price": "100", "variants": []}
+        ]
+
+    def test_catalog_cache(self):
+        """Prueba que los catálogos se reutilicen mientras la caché esté vigente"""
+        self.write_config({"ml_commission": 0, "catalog_cache_ttl": 300})
+        self.prepare_catalogs()
+
+        # Cada ejecución usa una instancia nueva, como cada ejecución de main.py
+        PriceSynchronizer(self.ml_api, self.tn_api, config_path=self.config_path).sync_prices()
+        result = PriceSynchronizer(self.ml_api, self.tn_api, config_path=self.config_path).sync_prices()
+
+        self.assertEqual(result, (0, 1, 0))
+        self.assertEqual(self.ml_api.get_products.call_count, 1)
+        self.assertEqual(self.tn_api.get_products.call_count, 1)
+
+        # El catálogo guardado conserva los nombres normalizados
+        with open(PriceSynchronizer(self.ml_api, self.tn_api,
+                                    config_path=self.config_path).catalog_cache_path) as f:
+            saved = json.load(f)
+        self.assertIn("_normalized_name", saved["tn"]["products"][0])
+
+        # --force-refresh vuelve a descargar ambos catálogos
+        synchronizer = PriceSynchronizer(self.ml_api, self.tn_api, config_path=self.config_path)
+        synchronizer.sync_prices(force_refresh=True)
+
+        self.assertEqual(self.ml_api.get_products.call_count, 2)
+        self.assertEqual(self.tn_api.get_products.call_count, 2)
+
+    def test_malformed_catalog_cache_is_ignored(self):
+        """Prueba que una caché con formato inválido se trate como si no existiera"""
+        self.write_config({"ml_commission": 0, "catalog_cache_ttl": 300})
+        self.prepare_catalogs()
+
+        synchronizer = PriceSynchronizer(self.ml_api, self.tn_api, config_path=self.config_path)
+        now = time.time()
+        malformed_caches = [
+            [],
+            {"ml": {"products": []}, "tn": {"saved_at": now}},
+            {"ml": {"saved_at": now, "products": [["ML1", "Producto"]]},
+             "tn": {"saved_at": now, "products": ["producto"]}},
+            {"ml": {"saved_at": "ayer", "products": {}}, "tn": None}
+        ]
+
+        for calls, cache in enumerate(malformed_caches, 1):
+            with open(synchronizer.catalog_cache_path, 'w') as f:
+                json.dump(cache, f)
+
+            self.assertEqual(synchronizer.sync_prices(), (0, 1, 0))
+            self.assertEqual(self.ml_api.get_products.call_count, calls)
+            self.assertEqual(self.tn_api.get_products.call_count, calls)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pruebas unitarias para el módulo de API de Tienda Nube.
+"""
+
+import os
+import sys
+import unittest
+import json
+import time
+import shutil
+import tempfile
+from unittest import mock
+
+import requests
+
+# Agregar el directorio raíz al path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.mercadolibre_api import MLProduct
+from src.api.tiendanube_api import TiendaNubeAPI
+from src.core.synchronizer import PriceSynchronizer
+
+def make_response(data=None, status=200, last_page=None):
+    """Crea una respuesta simulada de la API"""
+    response = mock.Mock(status_code=status)
+    response.content = json.dumps(data if data is not None else {}).encode()
+    response.links = {}
+    if last_page:
+        response.links = {"last": {"url": f"https://api.example.com/products?page={last_page}&per_page=200"}}
+
+    if status >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+    else:
+        response.raise_for_status.return_value = None
+    return response
+
+class TestTiendaNubeAPI(unittest.TestCase):
+    """Pruebas para la clase TiendaNubeAPI"""
+
+    def setUp(self):
+        """Configuración antes de cada prueba"""
+        # Directorio temporal: cada prueba usa su propio archivo de configuración
+        self.tmp_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.tmp_dir, "credentials.json")
+        with open(self.config_path, 'w') as f:
+            json.dump({
+                "tiendanube": {"api_key": "test_api_key", "user_id": "123"},
+                "settings": {"tn_api_rate_limit": 0}
+            }, f)
+
+    def tearDown(self):
+        """Limpieza después de cada prueba"""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    @mock.patch('requests.Session.request')
+    def test_get_products_with_link_header(self, mock_request):
+        """Prueba que el resto de páginas se pidan según el encabezado Link"""
+        pages = {1: [{"id": 1}], 2: [{"id": 2}], 3: [{"id": 3}]}
+        mock_request.side_effect = lambda method, url, params: make_response(
+            pages[params["page"]], last_page=3 if params["page"] == 1 else None)
+
+        api = TiendaNubeAPI(config_path=self.config_path)
+        products = api.get_products()
+
+        self.assertEqual([p["id"] for p in products], [1, 2, 3])
+        self.assertEqual(mock_request.call_count, 3)
+
+    @mock.patch('requests.Session.request')
+    def test_get_products_without_link_header(self, mock_request):
+        """Prueba que sin encabezado Link se pagine hasta una página vacía"""
+        pages = {1: [{"id": 1}], 2: [{"id": 2}], 3: []}
+        mock_request.side_effect = lambda method, url, params: make_response(pages[params["page"]])
+
+        api = TiendaNubeAPI(config_path=self.config_path)
+        products = api.get_products()
+
+        self.assertEqual([p["id"] for p in products], [1, 2])
+        self.assertEqual(mock_request.call_count, 3)
+
+    @mock.patch('requests.Session.request')
+    def test_iter_products_bounded_window(self, mock_request):
+        """Prueba que solo se descarguen las páginas de la ventana en curso"""
+        config_path = os.path.join(self.tmp_dir, "credentials_workers.json")
+        with open(config_path, 'w') as f:
+            json.dump({
+                "tiendanube": {"api_key": "test_api_key", "user_id": "123"},
+                "settings": {"tn_api_rate_limit": 0, "tn_api_max_workers": 2}
+            }, f)
+
+        mock_request.side_effect = lambda method, url, params: make_response(
+            [{"id": params["page"]}], last_page=20 if params["page"] == 1 else None)
+
+        api = TiendaNubeAPI(config_path=config_path)
+        products = api.iter_products()
+        self.assertEqual([next(products)["id"], next(products)["id"]], [1, 2])
+
+        # Aunque el consumidor se demore, no se piden páginas fuera de la ventana
+        time.sleep(0.2)
+        self.assertLessEqual(mock_request.call_count, 4)
+
+        products.close()
+        self.assertLessEqual(mock_request.call_count, 4)
+
+    @mock.patch('requests.Session.request')
+    def test_update_variant_prices_bulk(self, mock_request):
+        """Prueba que las variantes se actualicen en una sola petición"""
+        mock_request.return_value = make_response()
+
+        api = TiendaNubeAPI(config_path=self.config_path)
+        self.assertTrue(api.update_variant_prices(5, [(1, 10.0), (2, 20.0)]))
+
+        mock_request.assert_called_once()
+        args, kwargs = mock_request.call_args
+        self.assertEqual(args[0], "PATCH")
+        self.assertTrue(args[1].endswith("/products/5/variants"))
+        self.assertEqual(json.loads(kwargs["data"]), [{"id": 1, "price": 10.0}, {"id": 2, "price": 20.0}])
+
+    @mock.patch('requests.Session.request')
+    def test_update_variant_prices_fallback(self, mock_request):
+        """Prueba que si se rechaza la actualización en bloque se actualice cada variante"""
+        mock_request.side_effect = lambda method, url, data: make_response(
+            status=422 if method == "PATCH" else 200)
+
+        api = TiendaNubeAPI(config_path=self.config_path)
+        self.assertTrue(api.update_variant_prices(5, [(1, 10.0), (2, 20.0)]))
+
+        calls = sorted((args[0], args[1].split("/products/")[1]) for args, _ in mock_request.call_args_list)
+        self.assertEqual(calls, [("PATCH", "5/variants"), ("PUT", "5/variants/1"), ("PUT", "5/variants/2")])
+
+    @mock.patch('requests.Session.request')
+    def test_update_variant_prices_no_fallback_when_throttled(self, mock_request):
+        """Prueba que un 429 no dispare una petición por variante"""
+        mock_request.return_value = make_response(status=429)
+
+        api = TiendaNubeAPI(config_path=self.config_path)
+        self.assertFalse(api.update_variant_prices(5, [(1, 10.0), (2, 20.0)]))
+        mock_request.assert_called_once()
+
+    @mock.patch('requests.Session.request')
+    def test_consecutive_syncs_see_updated_prices(self, mock_request):
+        """Prueba que una segunda sincronización compare con los precios ya actualizados"""
+        config_path = os.path.join(self.tmp_dir, "credentials_sync.json")
+        with open(config_path, 'w') as f:
+            json.dump({
+                "tiendanube": {"api_key": "test_api_key", "user_id": "123"},
+                "settings": {"tn_api_rate_limit": 0, "ml_commission": 0, "catalog_cache_ttl": 0}
+            }, f)
+
+        # Estado del producto en Tienda Nube, modificado por cada PUT
+        tn_product = {"id": 1, "sku": "SKU1", "price": "100", "variants": []}
+
+        def request(method, url, **kwargs):
+            if method == "PUT":
+                tn_product["price"] = str(json.loads(kwargs["data"])["price"])
+                return make_response()
+            return make_response([dict(tn_product)] if kwargs["params"]["page"] == 1 else [])
+
+        mock_request.side_effect = request
+
+        ml_api = mock.Mock()
+        ml_api.iter_products.side_effect = lambda: iter(ml_api.get_products.return_value)
+        api = TiendaNubeAPI(config_path=config_path)
+        synchronizer = PriceSynchronizer(ml_api, api, config_path=config_path)
+
+        for ml_price in (90, 100):
+            ml_api.get_products.return_value = [
+                MLProduct("ML1", "Producto", ml_price, "ARS", "SKU1", "http://permalink", status="active")
+            ]
+            self.assertEqual(synchronizer.sync_prices(), (1, 0, 0))
+            self.assertEqual(float(tn_product["price"]), ml_price)
+
+    def test_session_retries_patch(self):
+        """Prueba que la sesión reintente las peticiones PATCH"""
+        api = TiendaNubeAPI(config_path=self.config_path)
+        retries = api.session.get_adapter("https://api.tiendanube.com").max_retries
+
+        self.assertIn("PATCH", retries.allowed_methods)
+        self.assertIn(429, retries.status_forcelist)
+
+if __name__ == '__main__':
+    unittest.main()